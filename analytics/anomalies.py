@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 
+from .common import ImmutableAttr
+
 def detect_anomalies(df: pd.DataFrame) -> dict:
     """Detect simple outliers in numeric columns using Z-score.
     Returns a dict mapping column name to a list of row indices considered anomalous.
@@ -16,3 +18,67 @@ def detect_anomalies(df: pd.DataFrame) -> dict:
         if outlier_idx:
             anomalies[col] = outlier_idx
     return anomalies
+
+
+class AnomalyScores(ImmutableAttr):
+    """Per-row IsolationForest scores for the full dataset (lower = more anomalous).
+
+    Stored compactly as float16 in `df.attrs`.
+    """
+
+    def __init__(self, scores: np.ndarray, threshold: float):
+        self.scores = scores
+        self.threshold = threshold
+
+    def is_anomaly(self, positions) -> np.ndarray:
+        return self.scores[np.asarray(positions)] < self.threshold
+
+
+def detect_multivariate_anomalies(df: pd.DataFrame, sample_df: pd.DataFrame = None, top_n: int = 20,
+                                  contamination: float = 0.01, chunk_size: int = 100_000, n_jobs: int = None):
+    """Fit an IsolationForest on a sample and score every row of `df` in chunks.
+    Returns (AnomalyScores, summary dict) or None if not applicable / scikit-learn missing.
+    Row ids in the summary are positional (0-based) row numbers.
+    """
+    try:
+        from sklearn.ensemble import IsolationForest
+    except ImportError:
+        return None
+    from concurrent.futures import ThreadPoolExecutor
+
+    numeric_cols = df.select_dtypes(include='number').columns.tolist()
+    if len(numeric_cols) < 2 or len(df) < 10:
+        return None
+    if sample_df is None:
+        sample_df = df
+
+    # Impute with sample medians so scoring never needs a full-data pass
+    fill = sample_df[numeric_cols].median()
+    train = sample_df[numeric_cols].fillna(fill).to_numpy(dtype=np.float32)
+    model = IsolationForest(n_estimators=100, contamination=contamination, random_state=42)
+    model.fit(train)
+
+    def score_chunk(start):
+        # Only this slice is materialized; bounded by chunk_size * n_jobs rows at a time
+        chunk = df.iloc[start:start + chunk_size][numeric_cols].fillna(fill).to_numpy(dtype=np.float32)
+        return model.score_samples(chunk).astype(np.float32)
+
+    starts = range(0, len(df), chunk_size)
+    workers = n_jobs or min(4, len(starts))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        scores = np.concatenate(list(pool.map(score_chunk, starts)))
+
+    threshold = float(model.offset_)
+    compact = scores.astype(np.float16)
+    flagged = compact < threshold  # Same precision the stored scores are checked with
+    top = np.argsort(scores)[:top_n]
+
+    summary = {
+        'method': 'isolation_forest',
+        'columns': numeric_cols,
+        'count': int(flagged.sum()),
+        'pct': round(float(flagged.mean()) * 100, 2),
+        'threshold': round(threshold, 4),
+        'top': [{'row': int(i), 'score': round(float(scores[i]), 4)} for i in top if flagged[i]],
+    }
+    return AnomalyScores(compact, threshold), summary
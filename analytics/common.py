@@ -0,0 +1,22 @@
+import numpy as np
+
+
+class ImmutableAttr:
+    """Base for precomputed results stored in `df.attrs`.
+
+    pandas deep-copies attrs on many DataFrame operations; subclasses are
+    treated as immutable, so __deepcopy__ hands back the same object instead
+    of copying their arrays every time the DataFrame is touched.
+    """
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def round_list(values, precision: int = 4) -> list:
+    """Round a sequence of numbers for JSON transport, mapping NaN/inf to None."""
+    arr = np.asarray(values, dtype=float)
+    if arr.size == 0:
+        return []
+    arr = np.round(arr, precision)
+    return [None if not np.isfinite(v) else float(v) for v in arr]
@@ -0,0 +1,133 @@
+import re
+import itertools
+import numpy as np
+import pandas as pd
+
+from .common import ImmutableAttr, round_list
+
+STATS = ['count', 'sum', 'mean', 'min', 'max']
+MAX_CARDINALITY = 50      # Dimensions with more distinct values are not pre-aggregated
+MAX_METRICS = 10
+MAX_PAIRS = 5
+MAX_PAIR_CELLS = 300      # Skip pairs whose cross product would be larger than this
+
+
+class AggregateCube(ImmutableAttr):
+    """Precomputed count/sum/min/max (mean derived) of each numeric metric,
+    grouped by each low-cardinality categorical dimension and a few dimension
+    pairs. Built once at ingest; breakdowns are then answered from these small
+    tables without touching the raw rows.
+    """
+
+    def __init__(self, dimensions: dict, metrics: list, tables: dict):
+        self.dimensions = dimensions  # dim -> cardinality
+        self.metrics = metrics
+        self.tables = tables          # (dim,) or (dim_a, dim_b) -> DataFrame[(metric, stat)]
+
+    @classmethod
+    def build(cls, df: pd.DataFrame):
+        numeric = df.select_dtypes(include='number')
+        metrics = numeric.var().sort_values(ascending=False).index.tolist()[:MAX_METRICS] if not numeric.empty else []
+
+        dimensions = {}
+        for col in df.select_dtypes(include=['object', 'category', 'bool']).columns:
+            n_unique = df[col].nunique()
+            if 2 <= n_unique <= MAX_CARDINALITY:
+                dimensions[col] = int(n_unique)
+
+        tables = {}
+        if not metrics:
+            return cls(dimensions, metrics, tables)
+
+        for dim in dimensions:
+            tables[(dim,)] = cls._aggregate(df, [dim], metrics)
+
+        pairs = [p for p in itertools.combinations(dimensions, 2)
+                 if dimensions[p[0]] * dimensions[p[1]] <= MAX_PAIR_CELLS]
+        pairs.sort(key=lambda p: dimensions[p[0]] * dimensions[p[1]])
+        for pair in pairs[:MAX_PAIRS]:
+            tables[pair] = cls._aggregate(df, list(pair), metrics)
+
+        return cls(dimensions, metrics, tables)
+
+    @staticmethod
+    def _aggregate(df, dims, metrics):
+        grouped = df.groupby(dims, observed=True, sort=False)[metrics].agg(['count', 'sum', 'min', 'max'])
+        grouped.index = grouped.index.map(lambda k: tuple(map(str, k)) if isinstance(k, tuple) else (str(k),))
+        return grouped.astype(np.float64)
+
+    def describe(self) -> dict:
+        """Small JSON-friendly description for the profile summary."""
+        return {
+            'dimensions': self.dimensions,
+            'metrics': self.metrics,
+            'pairs': [list(k) for k in self.tables if len(k) == 2],
+        }
+
+    def has(self, dim, by=None) -> bool:
+        return self._key(dim, by) is not None
+
+    def _key(self, dim, by=None):
+        if by is None:
+            return (dim,) if (dim,) in self.tables else None
+        for key in ((dim, by), (by, dim)):
+            if key in self.tables:
+                return key
+        return None
+
+    def breakdown(self, dim: str, metric: str, stat: str = 'sum', by: str = None,
+                  top: int = None, ascending: bool = False) -> dict:
+        """Return {'labels', 'values'} of `stat`(metric) grouped by dim (and `by`), sorted by value."""
+        if stat not in STATS:
+            raise ValueError(f"stat must be one of {STATS}")
+        if metric not in self.metrics:
+            raise KeyError(metric)
+        key = self._key(dim, by)
+        if key is None:
+            raise KeyError(dim if by is None else f"{dim} x {by}")
+
+        table = self.tables[key]
+        if stat == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values = table[(metric, 'sum')] / table[(metric, 'count')]
+        else:
+            values = table[(metric, stat)]
+        values = values.sort_values(ascending=ascending)
+        if top:
+            values = values.head(top)
+
+        labels = list(values.index)
+        if by is not None and key != (dim, by):
+            labels = [(b, a) for a, b in labels]  # Keep the requested (dim, by) order
+        return {
+            'dimension': dim,
+            'by': by,
+            'metric': metric,
+            'stat': stat,
+            'labels': [l[0] if len(l) == 1 else list(l) for l in labels],
+            'values': round_list(values.to_numpy()),
+        }
+
+    def context_for_question(self, question: str, max_groups: int = 10) -> str:
+        """Short text facts for chat: breakdowns of metrics/dimensions named in the question."""
+        q = question.lower()
+
+        def mentioned(name):
+            # Whole words only, so columns like 'id' or 'a' don't match every question
+            return re.search(r'(?<!\w)' + re.escape(str(name).lower()) + r'(?!\w)', q) is not None
+
+        dims = [d for d in self.dimensions if mentioned(d)]
+        metrics = [m for m in self.metrics if mentioned(m)]
+        if not dims:
+            return ""
+        if not metrics:
+            metrics = self.metrics[:1]
+        stat = 'mean' if any(mentioned(w) for w in ('average', 'mean', 'avg')) else 'sum'
+
+        lines = []
+        for dim in dims[:2]:
+            for metric in metrics[:2]:
+                result = self.breakdown(dim, metric, stat=stat, top=max_groups)
+                parts = ", ".join(f"{l}={v}" for l, v in zip(result['labels'], result['values']))
+                lines.append(f"{stat} of {metric} by {dim}: {parts}")
+        return "\n".join(lines)
@@ -0,0 +1,243 @@
+import io
+import os
+import time
+import zlib
+import hashlib
+import zipfile
+import threading
+import pandas as pd
+
+CHUNK_ROWS = 100_000
+MAX_BUFFERED_BYTES = 16 * 1024 * 1024  # Decompressed bytes waiting for the parser before the writer blocks
+
+SUPPORTED_EXTENSIONS = ('.csv', '.csv.gz', '.zip', '.csv.zst')
+
+
+def detect_compression(filename: str):
+    """Map an upload filename to 'none' / 'gzip' / 'zip' / 'zstd', or None if unsupported."""
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'none'
+    if name.endswith('.csv.gz'):
+        return 'gzip'
+    if name.endswith('.zip'):
+        return 'zip'
+    if name.endswith('.csv.zst'):
+        return 'zstd'
+    return None
+
+
+class _PipeReader(io.RawIOBase):
+    """In-memory pipe: the upload thread feeds bytes, the parser thread reads them.
+
+    The buffer is bounded, so a slow parser throttles the upload instead of
+    letting decompressed data pile up in memory.
+    """
+
+    def __init__(self, max_buffered=MAX_BUFFERED_BYTES):
+        self._buf = bytearray()
+        self._cond = threading.Condition()
+        self._eof = False
+        self._discard = False
+        self._max_buffered = max_buffered
+
+    def readable(self):
+        return True
+
+    def feed(self, data: bytes):
+        if not data:
+            return
+        with self._cond:
+            while len(self._buf) >= self._max_buffered and not self._discard:
+                self._cond.wait()
+            if self._discard:
+                return
+            self._buf.extend(data)
+            self._cond.notify_all()
+
+    def close_writer(self):
+        with self._cond:
+            self._eof = True
+            self._cond.notify_all()
+
+    def discard(self):
+        """Reader gave up (parse error): drop everything fed from now on."""
+        with self._cond:
+            self._discard = True
+            self._buf.clear()
+            self._cond.notify_all()
+
+    def readinto(self, b):
+        with self._cond:
+            while not self._buf and not self._eof:
+                self._cond.wait()
+            n = min(len(b), len(self._buf))
+            b[:n] = self._buf[:n]
+            del self._buf[:n]
+            self._cond.notify_all()
+            return n
+
+
+class StreamingCSVIngest:
+    """Consume an upload incrementally: write it to disk, hash it, decompress it
+    and parse it into DataFrame chunks, all while the body is still arriving.
+
+    Usage:
+        ingest = StreamingCSVIngest(path, filename)
+        for block in body: ingest.write(block)
+        df = ingest.finish()
+
+    .csv, .csv.gz and .csv.zst are parsed on the fly. A .zip keeps its
+    directory at the end of the archive, so it is hashed and saved while
+    streaming but only parsed (chunk-wise) once the upload completes.
+    """
+
+    def __init__(self, dest_path: str, filename: str, chunk_rows: int = CHUNK_ROWS):
+        self.compression = detect_compression(filename)
+        if self.compression is None:
+            raise ValueError(f"Unsupported file type. Expected one of: {', '.join(SUPPORTED_EXTENSIONS)}")
+
+        self._decoder = self._make_decompressor()
+        self.dest_path = dest_path
+        self.chunk_rows = chunk_rows
+        # Written beside the destination and moved into place only once the
+        # upload is valid, so a failed upload never replaces the previous file
+        self._part_path = dest_path + '.part'
+        self._file = open(self._part_path, 'wb')
+        self._hash = hashlib.sha256()
+        self._chunks = []
+        self._error = None
+        self._started = time.perf_counter()
+        self.stats = {
+            'filename': filename,
+            'compression': self.compression,
+            'bytes_received': 0,
+            'bytes_decompressed': 0,
+            'rows': 0,
+            'rows_parsed_during_upload': 0,
+        }
+
+        self._pipe = None
+        self._thread = None
+        if self.compression != 'zip':
+            self._pipe = _PipeReader()
+            self._thread = threading.Thread(target=self._parse, daemon=True)
+            self._thread.start()
+
+    def _make_decompressor(self):
+        if self.compression == 'gzip':
+            return _MultiFrameStream(lambda: zlib.decompressobj(16 + zlib.MAX_WBITS))
+        if self.compression == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                raise ValueError("Reading .csv.zst uploads requires the 'zstandard' package.")
+            return _MultiFrameStream(lambda: zstandard.ZstdDecompressor().decompressobj())
+        return None
+
+    def _parse(self):
+        try:
+            reader = io.BufferedReader(self._pipe, buffer_size=1024 * 1024)
+            for chunk in pd.read_csv(reader, chunksize=self.chunk_rows):
+                self._chunks.append(chunk)
+                self.stats['rows'] += len(chunk)
+        except Exception as e:
+            self._error = e
+            self._pipe.discard()
+
+    def write(self, data: bytes):
+        self._file.write(data)
+        self._hash.update(data)
+        self.stats['bytes_received'] += len(data)
+        if self._pipe is None:
+            return
+        if self._decoder is not None:
+            data = self._decoder.decompress(data)
+        self.stats['bytes_decompressed'] += len(data)
+        self._pipe.feed(data)
+
+    def finish(self) -> pd.DataFrame:
+        """Upload complete: flush, wait for the parser and return the full DataFrame.
+
+        Raises ValueError (and discards the partial file) if the upload is
+        truncated, corrupt or empty.
+        """
+        self._file.close()
+        self.stats['upload_s'] = round(time.perf_counter() - self._started, 3)
+        self.stats['sha256'] = self._hash.hexdigest()
+
+        if self._pipe is None:
+            self._parse_zip()
+        else:
+            self.stats['rows_parsed_during_upload'] = self.stats['rows']
+            self._pipe.close_writer()
+            self._thread.join()
+
+        error = None
+        if self._decoder is not None and not self._decoder.eof:
+            error = f"The {self.compression} stream is truncated (upload incomplete or corrupt)."
+        elif self._error is not None:
+            error = f"Could not parse CSV: {self._error}"
+        elif not self._chunks:
+            error = "The uploaded file contains no rows."
+        if error:
+            self._chunks = []
+            self._remove_file()
+            raise ValueError(error)
+
+        os.replace(self._part_path, self.dest_path)
+        df = pd.concat(self._chunks, ignore_index=True) if len(self._chunks) > 1 else self._chunks[0]
+        self._chunks = []
+        self.stats['total_s'] = round(time.perf_counter() - self._started, 3)
+        return df
+
+    def abort(self):
+        """Upload failed midway: stop the parser and remove the partial file."""
+        self._file.close()
+        if self._pipe is not None:
+            self._pipe.discard()
+            self._pipe.close_writer()
+            self._thread.join()
+        self._remove_file()
+
+    def _remove_file(self):
+        if os.path.exists(self._part_path):
+            os.remove(self._part_path)
+
+    def _parse_zip(self):
+        try:
+            with zipfile.ZipFile(self._part_path) as archive:
+                members = [n for n in archive.namelist() if n.lower().endswith('.csv') and not n.startswith('__MACOSX')]
+                if not members:
+                    raise ValueError("no .csv file inside the archive")
+                with archive.open(members[0]) as member:
+                    for chunk in pd.read_csv(member, chunksize=self.chunk_rows):
+                        self._chunks.append(chunk)
+                        self.stats['rows'] += len(chunk)
+        except Exception as e:
+            self._error = e
+
+
+class _MultiFrameStream:
+    """Incremental decoder for gzip members / zstd frames that may be concatenated.
+
+    `eof` is True only when the input so far ends exactly on a member/frame
+    boundary, so a truncated upload can be told apart from a complete one.
+    """
+
+    def __init__(self, new_decoder):
+        self._new_decoder = new_decoder
+        self._d = new_decoder()
+        self.eof = False
+
+    def decompress(self, data: bytes) -> bytes:
+        out = []
+        while data:
+            self.eof = False
+            out.append(self._d.decompress(data))
+            if not self._d.eof:
+                break
+            self.eof = True
+            data = self._d.unused_data
+            self._d = self._new_decoder()
+        return b''.join(out)
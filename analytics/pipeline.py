@@ -1,16 +1,25 @@
 import pandas as pd
 import io
+import os
 from .profiling import generate_profile_summary
 from .trends import detect_trends
 from .correlation import compute_correlations
-from .anomalies import detect_anomalies
+from .anomalies import detect_anomalies, detect_multivariate_anomalies
+from .timeseries import parse_datetime_columns, TimeSeriesRollups
+from .cube import AggregateCube
 
-def run_analytics_pipeline(uploaded_file) -> pd.DataFrame:
-    """Process the uploaded CSV (path, bytes, or file‑like) and enrich it with analytics.
+# Opt-in: scoring every row adds seconds per million rows to the upload request
+MULTIVARIATE_ANOMALIES = os.getenv('MULTIVARIATE_ANOMALIES', '0') == '1'
+
+def run_analytics_pipeline(uploaded_file, multivariate_anomalies: bool = MULTIVARIATE_ANOMALIES) -> pd.DataFrame:
+    """Process the uploaded CSV (path, bytes, file‑like, or an already-parsed DataFrame) and enrich it with analytics.
     Returns the DataFrame with an added attribute `profile_summary` containing a dictionary of profiling, trends, correlations and anomalies.
     """
-    # Accept a file path string, raw bytes, or a file‑like object (Flask's FileStorage)
-    if isinstance(uploaded_file, str):
+    # Accept a file path string, raw bytes, a file‑like object (Flask's FileStorage),
+    # or a DataFrame parsed during a streaming upload (analytics.ingest)
+    if isinstance(uploaded_file, pd.DataFrame):
+        df = uploaded_file
+    elif isinstance(uploaded_file, str):
         df = pd.read_csv(uploaded_file)
     elif isinstance(uploaded_file, bytes):
         df = pd.read_csv(io.BytesIO(uploaded_file))
@@ -23,6 +32,10 @@ def run_analytics_pipeline(uploaded_file) -> pd.DataFrame:
     if noise_cols:
         df = df.drop(columns=noise_cols)
 
+    # Parse date/time columns once at ingest; the first one becomes the time axis
+    datetime_cols = parse_datetime_columns(df)
+    time_col = datetime_cols[0] if datetime_cols else None
+
     # Create a sample for expensive AI/Stats operations if dataset is huge
     SAMPLE_SIZE = 2000
     if len(df) > SAMPLE_SIZE:
@@ -37,8 +50,8 @@ def run_analytics_pipeline(uploaded_file) -> pd.DataFrame:
     profile['rows'] = len(df)
     profile['columns'] = len(df.columns)
 
-    # Trend detection (Run on sample)
-    trends = detect_trends(sample_df)
+    # Trend detection (Run on sample; regresses on real time when available)
+    trends = detect_trends(sample_df, time_col=time_col)
     # Correlation matrix (Run on sample)
     correlations = compute_correlations(sample_df)
     # Anomaly detection (Run on sample)
@@ -51,6 +64,27 @@ def run_analytics_pipeline(uploaded_file) -> pd.DataFrame:
         "correlations": correlations,
         "anomalies": anomalies,
     }
+
+    # Multivariate outliers: IsolationForest fit on the sample, scored on every row
+    if multivariate_anomalies:
+        result = detect_multivariate_anomalies(df, sample_df)
+        if result is not None:
+            scores, mv_summary = result
+            df.attrs['anomaly_scores'] = scores
+            summary["multivariate_anomalies"] = mv_summary
+
+    # Group-by aggregate cube for categorical breakdowns (full data, built once)
+    cube = AggregateCube.build(df)
+    if cube.tables:
+        df.attrs['cube'] = cube
+        summary["cube"] = cube.describe()
+
+    # Multi-resolution rollups of the key metrics (full data, one pass)
+    if time_col and df[time_col].notna().sum() > 1 and not df.select_dtypes(include='number').empty:
+        rollups = TimeSeriesRollups.build(df, time_col)
+        df.attrs['timeseries'] = rollups
+        summary["timeseries"] = rollups.describe()
+
     # Attach as attribute for easy access in Flask templates
     # Store summary in df.attrs (metadata) to avoid Pandas UserWarning
     df.attrs['profile_summary'] = summary
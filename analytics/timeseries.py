@@ -0,0 +1,184 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+from .common import ImmutableAttr, round_list
+
+# Finest -> coarsest. Each level is aggregated from the previous one, not from the raw rows.
+RESOLUTIONS = ['minute', 'hour', 'day', 'week', 'month']
+STATS = ['count', 'sum', 'min', 'max']
+MAX_METRICS = 10
+DATETIME_NAME_HINTS = ('date', 'time', 'timestamp', 'day', 'month', 'year', 'period', 'created', 'updated')
+
+
+def _to_datetime(values: pd.Series):
+    """Parse to datetime64, or return None if the values don't form a datetime column.
+
+    Strings with differing UTC offsets (local time across a DST switch) can't
+    share one naive or fixed-offset dtype, so those are normalised to UTC.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # "Could not infer format" noise
+        try:
+            parsed = pd.to_datetime(values, errors='coerce')
+        except (ValueError, TypeError):
+            parsed = None  # pandas 3 raises on mixed offsets; pandas 2 returns objects
+        if parsed is None or not pd.api.types.is_datetime64_any_dtype(parsed):
+            try:
+                parsed = pd.to_datetime(values, errors='coerce', utc=True)
+            except (ValueError, TypeError):
+                return None
+    return parsed if pd.api.types.is_datetime64_any_dtype(parsed) else None
+
+
+def parse_datetime_columns(df: pd.DataFrame, sample_size: int = 200, min_parsed: float = 0.9) -> list:
+    """Detect text columns holding dates and convert them to datetime64 in place.
+    Returns the list of datetime columns (already-typed ones included).
+    """
+    datetime_cols = df.select_dtypes(include=['datetime', 'datetimetz']).columns.tolist()
+    for col in df.select_dtypes(include=['object']).columns:
+        sample = df[col].dropna().head(sample_size)
+        if sample.empty:
+            continue
+        # Cheap guard: purely numeric strings (ids, amounts) are not dates
+        if pd.to_numeric(sample, errors='coerce').notna().mean() > 0.5:
+            continue
+        parsed = _to_datetime(sample)
+        if parsed is None:
+            continue
+        rate = parsed.notna().mean()
+        hinted = any(h in col.lower() for h in DATETIME_NAME_HINTS)
+        if rate < min_parsed and not (hinted and rate >= 0.5):
+            continue
+        parsed = _to_datetime(df[col])
+        if parsed is None:
+            continue
+        df[col] = parsed
+        datetime_cols.append(col)
+    return datetime_cols
+
+
+def _to_ns(value) -> int:
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return int(ts.value)
+
+
+def _bucket_keys(index: pd.DatetimeIndex, resolution: str):
+    if resolution == 'minute':
+        return index.floor('min')
+    if resolution == 'hour':
+        return index.floor('h')
+    if resolution == 'day':
+        return index.floor('D')
+    if resolution == 'week':
+        return index.to_period('W').start_time
+    return index.to_period('M').start_time
+
+
+def _combine(frame: pd.DataFrame, keys) -> pd.DataFrame:
+    """Aggregate a (metric, stat) column frame into coarser buckets."""
+    funcs = {'count': 'sum', 'sum': 'sum', 'min': 'min', 'max': 'max'}
+    return frame.groupby(keys).agg({col: funcs[col[1]] for col in frame.columns})
+
+
+class TimeSeriesRollups(ImmutableAttr):
+    """Multi-resolution (minute/hour/day/week/month) aggregates of the key metrics.
+
+    Every level stores sorted bucket start times plus count/sum/min/max per
+    metric as numpy arrays, so serving a window is two binary searches and a
+    slice: O(log n + points returned), regardless of the raw row count. The
+    minute level is the finest one kept; no copy of the raw rows is held.
+    """
+
+    def __init__(self, time_col: str, metrics: list, points: int, start_ns: int, end_ns: int, levels: dict):
+        self.time_col = time_col
+        self.metrics = metrics
+        self.points = points      # Rows with a valid timestamp
+        self.start_ns = start_ns
+        self.end_ns = end_ns
+        self.levels = levels
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, time_col: str, metrics: list = None):
+        if metrics is None:
+            numeric = df.select_dtypes(include='number')
+            metrics = numeric.var().sort_values(ascending=False).index.tolist()
+        metrics = metrics[:MAX_METRICS]
+
+        frame = df[[time_col] + metrics].dropna(subset=[time_col])
+        times = frame[time_col]
+        if getattr(times.dt, 'tz', None) is not None:
+            times = times.dt.tz_convert('UTC').dt.tz_localize(None)
+        index = pd.DatetimeIndex(times.values.astype('datetime64[ns]'))
+        points = len(index)
+        start_ns = int(index.min().value) if points else None
+        end_ns = int(index.max().value) if points else None
+
+        # groupby sorts the minute buckets, so the raw rows never need sorting
+        values = frame[metrics].astype(float)
+        current = values.groupby(_bucket_keys(index, 'minute')).agg(STATS)
+
+        levels = {}
+        for resolution in RESOLUTIONS:
+            if resolution != 'minute':
+                # week/month are built from days, so buckets nest cleanly
+                source = levels['day']['frame'] if resolution in ('week', 'month') else current
+                current = _combine(source, _bucket_keys(source.index, resolution))
+            levels[resolution] = {'frame': current}
+
+        for resolution, level in levels.items():
+            agg = level.pop('frame')
+            level['t'] = agg.index.values.astype('datetime64[ns]').view('int64')
+            for m in metrics:
+                level[m] = {stat: agg[(m, stat)].to_numpy(dtype=float) for stat in STATS}
+
+        return cls(time_col, metrics, points, start_ns, end_ns, levels)
+
+    def describe(self) -> dict:
+        """Small JSON-friendly description for the profile summary."""
+        if not self.points:
+            return {'time_column': self.time_col, 'metrics': self.metrics}
+        return {
+            'time_column': self.time_col,
+            'start': pd.Timestamp(self.start_ns).isoformat(),
+            'end': pd.Timestamp(self.end_ns).isoformat(),
+            'points': self.points,
+            'metrics': self.metrics,
+            'resolutions': {r: int(len(self.levels[r]['t'])) for r in RESOLUTIONS},
+        }
+
+    def query(self, metric: str, start=None, end=None, max_points: int = 500) -> dict:
+        """Return the finest resolution that fits `max_points` buckets within [start, end]."""
+        if metric not in self.metrics:
+            raise KeyError(metric)
+        lo = _to_ns(start) if start is not None else None
+        hi = _to_ns(end) if end is not None else None
+
+        def window(t):
+            i0 = 0 if lo is None else int(np.searchsorted(t, lo, side='left'))
+            i1 = len(t) if hi is None else int(np.searchsorted(t, hi, side='right'))
+            return i0, i1
+
+        for resolution in RESOLUTIONS:
+            level = self.levels[resolution]
+            i0, i1 = window(level['t'])
+            if i1 - i0 <= max_points or resolution == RESOLUTIONS[-1]:
+                stats = level[metric]
+                step = max(1, -(-(i1 - i0) // max_points))  # Only if even months overflow
+                sl = slice(i0, i1, step)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    mean = stats['sum'][sl] / stats['count'][sl]
+                return self._result(metric, resolution, level['t'][sl], mean, stats['min'][sl], stats['max'][sl])
+
+    @staticmethod
+    def _result(metric, resolution, t, mean, vmin, vmax) -> dict:
+        return {
+            'metric': metric,
+            'resolution': resolution,
+            't': (np.asarray(t, dtype='int64') // 1_000_000).tolist(),  # epoch ms
+            'mean': round_list(mean),
+            'min': round_list(vmin),
+            'max': round_list(vmax),
+        }
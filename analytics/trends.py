@@ -2,26 +2,35 @@ import pandas as pd
 import numpy as np
 from scipy.stats import linregress
 
-def detect_trends(df: pd.DataFrame) -> dict:
+def detect_trends(df: pd.DataFrame, time_col: str = None) -> dict:
     """Detect simple linear trends for numeric columns.
     Returns a dict mapping column name to a description of the trend
     based on the slope of a linear regression.
+    If `time_col` (datetime64) is given, x is elapsed days instead of row order.
     """
     trends = {}
     numeric_cols = df.select_dtypes(include='number').columns
     for col in numeric_cols:
-        series = df[col].dropna()
-        if len(series) < 2:
+        if time_col:
+            pair = df[[time_col, col]].dropna()
+            series = pair[col]
+            # Elapsed days since the first observation (row order is not time)
+            x = (pair[time_col] - pair[time_col].min()).dt.total_seconds().to_numpy() / 86400.0
+            unit = " per day"
+        else:
+            series = df[col].dropna()
+            # Use index as x values
+            x = np.arange(len(series))
+            unit = ""
+        if len(series) < 2 or np.ptp(x) == 0:
             continue
-        # Use index as x values
-        x = np.arange(len(series))
         slope, intercept, r_value, p_value, std_err = linregress(x, series)
         if abs(slope) < 1e-6:
             trend_desc = "no significant trend"
         elif slope > 0:
-            trend_desc = f"increasing trend (slope={slope:.4f})"
+            trend_desc = f"increasing trend (slope={slope:.4f}{unit})"
         else:
-            trend_desc = f"decreasing trend (slope={slope:.4f})"
+            trend_desc = f"decreasing trend (slope={slope:.4f}{unit})"
         trends[col] = {
             "description": trend_desc,
             "r_squared": r_value ** 2,
@@ -1,6 +1,10 @@
 import pandas as pd
 import numpy as np
 
+from .common import round_list
+
+TREND_LABEL_FORMATS = {'day': '%Y-%m-%d', 'week': '%Y-%m-%d', 'month': '%Y-%m'}
+
 def prepare_chart_data(df: pd.DataFrame, summary: dict) -> dict:
     """
     Prepare data for Chart.js visualizations (KPIs, Trends, Bar, Heatmap, Scatter).
@@ -17,8 +21,11 @@ def prepare_chart_data(df: pd.DataFrame, summary: dict) -> dict:
     missing_pct = (total_missing / total_cells) * 100 if total_cells > 0 else 0
     
     # Calculate anomaly count (if available in summary)
+    # Prefer the multivariate detector: it scored every row, not just the sample
     anomaly_count = 0
-    if summary and 'anomalies' in summary:
+    if summary and 'multivariate_anomalies' in summary:
+         anomaly_count = summary['multivariate_anomalies']['count']
+    elif summary and 'anomalies' in summary:
          for idx_list in summary['anomalies'].values():
              anomaly_count += len(idx_list)
     anomaly_pct = (anomaly_count / len(df)) * 100 if len(df) > 0 else 0
@@ -39,7 +46,18 @@ def prepare_chart_data(df: pd.DataFrame, summary: dict) -> dict:
         variances = df[numeric_cols].var()
         metric_col = variances.idxmax()
     
-    if metric_col:
+    rollups = df.attrs.get('timeseries')
+    if metric_col and rollups is not None and metric_col in rollups.metrics:
+        # Real time axis: finest rollup level that fits in 50 buckets
+        series = rollups.query(metric_col, max_points=50)
+        fmt = TREND_LABEL_FORMATS.get(series['resolution'], '%Y-%m-%d %H:%M')
+        charts['trend'] = {
+            'label': metric_col,
+            'labels': [pd.Timestamp(t, unit='ms').strftime(fmt) for t in series['t']],
+            'data': [0 if v is None else v for v in series['mean']],
+            'resolution': series['resolution']
+        }
+    elif metric_col:
         # Downsample for chart if too big (max 50 points)
         if len(df) > 50:
             df_chart = df.iloc[::len(df)//50, :]
@@ -54,15 +72,30 @@ def prepare_chart_data(df: pd.DataFrame, summary: dict) -> dict:
 
     # 3. Bar Chart (Category Comparison)
     # Pick a categorical col with 3-15 unique values
+    cube = df.attrs.get('cube')
     cat_col = None
-    if categorical_cols:
+    if cube is not None:
+        # Cardinalities were computed once at ingest
+        for col, n_unique in cube.dimensions.items():
+            if 3 <= n_unique <= 15:
+                cat_col = col
+                break
+    elif categorical_cols:
         for col in categorical_cols:
             n_unique = df[col].nunique()
             if 3 <= n_unique <= 15:
                 cat_col = col
                 break
     
-    if cat_col and metric_col:
+    if cat_col and metric_col and cube is not None and cube.has(cat_col) and metric_col in cube.metrics:
+        # Served from the precomputed cube; no scan of the raw rows
+        grouped = cube.breakdown(cat_col, metric_col, stat='sum', top=10)
+        charts['bar'] = {
+            'label': f"{metric_col} by {cat_col}",
+            'labels': grouped['labels'],
+            'data': grouped['values']
+        }
+    elif cat_col and metric_col:
         # Aggregate metric by category
         grouped = df.groupby(cat_col)[metric_col].sum().sort_values(ascending=False).head(10)
         charts['bar'] = {
@@ -91,24 +124,34 @@ def prepare_chart_data(df: pd.DataFrame, summary: dict) -> dict:
         x_col = numeric_cols[0]
         y_col = numeric_cols[1]
         
-        # Determine anomaly indices
-        anomaly_indices = set()
-        if summary and 'anomalies' in summary:
-             for idx_list in summary['anomalies'].values():
-                 anomaly_indices.update(idx_list)
-        
         normal_data = []
         anomaly_data = []
-        
-        # Sample if too large (max 200 points) to avoid lag
-        sample_df = df.head(200)
-        
-        for idx, row in sample_df.iterrows():
-            point = {'x': row[x_col], 'y': row[y_col]}
-            if idx in anomaly_indices:
-                anomaly_data.append(point)
-            else:
-                normal_data.append(point)
+        scores = df.attrs.get('anomaly_scores')
+
+        if scores is not None:
+            # Plot the first 200 rows plus the top-ranked anomalies so they are always visible
+            top_rows = [a['row'] for a in summary.get('multivariate_anomalies', {}).get('top', [])]
+            positions = np.unique(np.concatenate([np.arange(min(200, len(df))), np.asarray(top_rows, dtype=int)]))
+            flags = scores.is_anomaly(positions)
+            points = df.iloc[positions][[x_col, y_col]].to_numpy()
+            for (x, y), flagged in zip(points, flags):
+                (anomaly_data if flagged else normal_data).append({'x': x, 'y': y})
+        else:
+            # Determine anomaly indices
+            anomaly_indices = set()
+            if summary and 'anomalies' in summary:
+                 for idx_list in summary['anomalies'].values():
+                     anomaly_indices.update(idx_list)
+
+            # Sample if too large (max 200 points) to avoid lag
+            sample_df = df.head(200)
+
+            for idx, row in sample_df.iterrows():
+                point = {'x': row[x_col], 'y': row[y_col]}
+                if idx in anomaly_indices:
+                    anomaly_data.append(point)
+                else:
+                    normal_data.append(point)
 
         charts['scatter'] = {
             'x_label': x_col,
@@ -118,3 +161,64 @@ def prepare_chart_data(df: pd.DataFrame, summary: dict) -> dict:
         }
 
     return charts
+
+
+def encode_chart_payload(charts: dict, precision: int = 4) -> dict:
+    """
+    Convert the output of `prepare_chart_data` into a compact, columnar payload
+    for the /api/charts endpoint (rounded floats, parallel arrays instead of
+    lists of point dicts, heatmap as a dense matrix).
+    """
+    if not charts:
+        return {}
+
+    payload = {}
+
+    if 'kpi' in charts:
+        payload['kpi'] = {k: (round(float(v), 1) if isinstance(v, float) else int(v))
+                          for k, v in charts['kpi'].items()}
+
+    if 'trend' in charts:
+        trend = charts['trend']
+        payload['trend'] = {
+            'label': trend['label'],
+            'labels': trend['labels'],
+            'data': round_list(trend['data'], precision),
+            'resolution': trend.get('resolution')
+        }
+
+    if 'bar' in charts:
+        bar = charts['bar']
+        payload['bar'] = {
+            'label': bar['label'],
+            'labels': bar['labels'],
+            'data': round_list(bar['data'], precision)
+        }
+
+    if 'heatmap' in charts:
+        labels = charts['heatmap']['labels']
+        pos = {label: i for i, label in enumerate(labels)}
+        matrix = np.full((len(labels), len(labels)), np.nan)
+        for cell in charts['heatmap']['data']:
+            matrix[pos[cell['x']], pos[cell['y']]] = cell['v']
+        payload['heatmap'] = {
+            'labels': labels,
+            'matrix': [round_list(row, 2) for row in matrix]
+        }
+
+    if 'scatter' in charts:
+        scatter = charts['scatter']
+        payload['scatter'] = {
+            'x_label': scatter['x_label'],
+            'y_label': scatter['y_label'],
+            'normal': {
+                'x': round_list([p['x'] for p in scatter['normal']], precision),
+                'y': round_list([p['y'] for p in scatter['normal']], precision)
+            },
+            'anomalies': {
+                'x': round_list([p['x'] for p in scatter['anomalies']], precision),
+                'y': round_list([p['y'] for p in scatter['anomalies']], precision)
+            }
+        }
+
+    return payload
@@ -1,14 +1,17 @@
 import os
 import json
+import gzip
+import time
+import hashlib
 import threading
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+from flask import Flask, render_template, request, redirect, url_for, session, flash, make_response
 from werkzeug.utils import secure_filename
-import pandas as pd
 
 # Local imports
+# NOTE: analytics (pandas/SciPy) and llm modules are imported lazily inside the
+# functions that need them, and preloaded in a background thread (see below),
+# so the server can start accepting requests immediately.
 from auth.db import get_connection
-from analytics.pipeline import run_analytics_pipeline
-from llm.ollama import get_llama_explanation
 
 app = Flask(__name__)
 app.secret_key = 'dev-secret-key-data-analyst-123'  # Stability for development
@@ -57,16 +60,18 @@ def _ensure_insights(user, data):
         return data
 
     try:
-        from llm.ollama import get_llama_explanation
-        from utils.insight_parser import parse_insight_markdown
+        from llm.insights import generate_structured_insights
         
         mode = data.get('mode', 'business')
         summary = data.get('summary')
         
         if summary:
-            raw_insight = get_llama_explanation(summary, mode=mode)
-            parsed_insight = parse_insight_markdown(raw_insight)
-            data['insight'] = parsed_insight
+            # Per-section JSON requests, each queued at background priority behind chat
+            stats = {}
+            insight = generate_structured_insights(summary, mode=mode, user=user, stats=stats)
+            data['insight_stats'] = stats
+            data['insight_queue_wait_s'] = stats.get('queue_wait_s')
+            data['insight'] = insight  # Set last: readers poll on it
             # Update cache
             ANALYSIS_CACHE[user] = data
     except Exception as e:
@@ -75,12 +80,166 @@ def _ensure_insights(user, data):
     
     return data
 
+# ---------------------------------------------------------------------------
+# Helper functions for Chart Data
+# ---------------------------------------------------------------------------
+def _build_chart_payload(data):
+    """Precomputes the compact JSON body served by /api/charts, plus its gzip form and ETag."""
+    from analytics.visualization import prepare_chart_data, encode_chart_payload
+
+    if data.get('chart_data') is None and data.get('df') is not None:
+        data['chart_data'] = prepare_chart_data(data['df'], data.get('summary'))
+
+    body = json.dumps(encode_chart_payload(data.get('chart_data')), separators=(',', ':')).encode('utf-8')
+    data['chart_payload'] = {
+        'body': body,
+        'gzip': gzip.compress(body, compresslevel=6),
+        'etag': hashlib.sha1(body).hexdigest()
+    }
+    return data
+
+# ---------------------------------------------------------------------------
+# Helper functions for Streaming Upload
+# ---------------------------------------------------------------------------
+UPLOAD_READ_SIZE = 256 * 1024
+
+def _stream_upload():
+    """Reads the multipart body straight from the socket instead of letting Flask
+    spool it to a temp file first. File bytes are saved, hashed, decompressed and
+    parsed as they arrive (see analytics.ingest), so parsing overlaps the upload.
+    Returns (df, filename, form_fields, ingest_stats); raises ValueError on bad input.
+    """
+    from werkzeug.sansio.multipart import MultipartDecoder, Field, File, Data, Epilogue, NeedData
+    from analytics.ingest import StreamingCSVIngest
+
+    boundary = request.mimetype_params.get('boundary')
+    if request.mimetype != 'multipart/form-data' or not boundary:
+        raise ValueError('Expected a multipart file upload.')
+
+    decoder = MultipartDecoder(boundary.encode('latin-1'), max_form_memory_size=1024 * 1024)
+    stream = request.stream
+    fields = {}
+    field_name, field_buf = None, None
+    ingest, filename = None, None
+    in_upload = False  # Whether the current part is the file being ingested
+
+    try:
+        while True:
+            chunk = stream.read(UPLOAD_READ_SIZE)
+            decoder.receive_data(chunk or None)
+            event = decoder.next_event()
+            while not isinstance(event, (Epilogue, NeedData)):
+                if isinstance(event, File):
+                    field_name, field_buf, in_upload = None, None, False
+                    if event.name == 'file' and ingest is None and event.filename:
+                        filename = secure_filename(event.filename)
+                        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+                        ingest = StreamingCSVIngest(file_path, filename)
+                        in_upload = True
+                elif isinstance(event, Field):
+                    field_name, field_buf, in_upload = event.name, [], False
+                elif isinstance(event, Data):
+                    if field_buf is not None:
+                        field_buf.append(event.data)
+                        if not event.more_data:
+                            fields[field_name] = b''.join(field_buf).decode('utf-8', 'replace')
+                            field_name, field_buf = None, None
+                    elif in_upload:
+                        ingest.write(event.data)
+                    # Data of any other file part is dropped
+                event = decoder.next_event()
+            if not chunk:
+                break
+    except Exception:
+        if ingest is not None:
+            ingest.abort()
+        raise
+
+    if ingest is None:
+        raise ValueError('No file selected.')
+    df = ingest.finish()
+    return df, filename, fields, ingest.stats
+
+# ---------------------------------------------------------------------------
+# Startup: background preload & readiness
+# ---------------------------------------------------------------------------
+# 'model' is None while the prewarm is still running, then True/False
+STARTUP = {
+    'started_at': time.time(),
+    'analytics': False,
+    'analytics_error': None,
+    'model': None,
+    'preload_s': None,
+}
+_preload_started = False
+
+WARMUP_CSV = b"""date,region,sales,qty
+2024-01-01,North,120.5,3
+2024-01-02,South,98.0,2
+2024-01-03,East,143.2,5
+2024-01-04,West,110.7,4
+"""
+
+def _preload_analytics():
+    """Import the heavy analytics stack and run one tiny pipeline so the first upload is warm."""
+    start = time.perf_counter()
+    try:
+        from analytics.pipeline import run_analytics_pipeline
+        from analytics.visualization import prepare_chart_data
+        df = run_analytics_pipeline(WARMUP_CSV)
+        prepare_chart_data(df, df.attrs.get('profile_summary'))
+        STARTUP['analytics'] = True
+    except Exception as e:
+        STARTUP['analytics_error'] = str(e)
+        print(f"Analytics preload failed: {e}")
+    STARTUP['preload_s'] = round(time.perf_counter() - start, 3)
+
+def _prewarm_model():
+    """Load the Ollama model ahead of the first chat (keep_alive only applies after a request)."""
+    from llm.ollama import prewarm_model
+    STARTUP['model'] = prewarm_model()
+
+def start_preload():
+    """Kick off analytics preload and model prewarm once, without blocking startup."""
+    global _preload_started
+    if _preload_started or os.getenv('APP_PRELOAD', '1') == '0':
+        return
+    _preload_started = True
+    threading.Thread(target=_preload_analytics, daemon=True).start()
+    threading.Thread(target=_prewarm_model, daemon=True).start()
+
 # ---------------------------------------------------------------------------
 # Routes
 # ---------------------------------------------------------------------------
 # In-Memory Cache for Analysis Results
 # Format: { 'username': { 'df': df, 'summary': dict, 'insight': dict, 'chart': dict } }
 ANALYSIS_CACHE = {}
+# Multi-turn chat state: { 'username': ChatSession }
+CHAT_SESSIONS = {}
+
+def get_chat_session(user):
+    from llm.chat_session import ChatSession
+    if user not in CHAT_SESSIONS:
+        CHAT_SESSIONS[user] = ChatSession()
+    return CHAT_SESSIONS[user]
+
+@app.route('/healthz')
+def healthz():
+    """Liveness: the process is up and serving requests."""
+    return {'status': 'ok', 'uptime_s': round(time.time() - STARTUP['started_at'], 1)}
+
+@app.route('/readyz')
+def readyz():
+    """Readiness: analytics stack loaded. Model state is reported but not required (chat degrades gracefully)."""
+    ready = STARTUP['analytics']
+    body = {
+        'ready': ready,
+        'analytics': STARTUP['analytics'],
+        'analytics_error': STARTUP['analytics_error'],
+        'model': {None: 'warming' if _preload_started else 'cold', True: 'loaded', False: 'unavailable'}[STARTUP['model']],
+        'preload_s': STARTUP['preload_s'],
+    }
+    return body, (200 if ready else 503)
 
 @app.route('/')
 def home():
@@ -134,16 +293,18 @@ def get_cached_data():
         if os.path.exists(file_path):
             try:
                 # Reload dataframe and summary
+                from analytics.pipeline import run_analytics_pipeline
                 df = run_analytics_pipeline(file_path)
                 data = {
                     'df': df,
                     'summary': df.attrs.get('profile_summary'),
                     'insight': None,
-                    'chart_data': None, # Will be regenerated on dashboard hit
+                    'chart_data': None, # Regenerated by _build_chart_payload
                     'preview_html': df.head(10).to_html(classes='table table-striped', index=False),
                     'mode': 'business',
                     'filename': filename
                 }
+                _build_chart_payload(data)
                 ANALYSIS_CACHE[user] = data
                 # Trigger insights in background again
                 threading.Thread(target=_ensure_insights, args=(user, data)).start()
@@ -162,18 +323,18 @@ def dashboard():
     
     # Handle File Upload & Analysis
     if request.method == 'POST':
-        file = request.files.get('file')
-        if file and file.filename.endswith('.csv'):
-            filename = secure_filename(file.filename)
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
-            
-            # Run analytics pipeline
-            df = run_analytics_pipeline(file_path)
+        try:
+            df, filename, fields, ingest_stats = _stream_upload()
+        except ValueError as e:
+            flash(f'Please upload a valid CSV file. {e}', 'danger')
+        else:
+            # Run analytics pipeline (the CSV was already parsed while uploading)
+            from analytics.pipeline import run_analytics_pipeline
+            df = run_analytics_pipeline(df)
             profile_summary = df.attrs.get('profile_summary')
             
             # Retrieve mode
-            mode = request.form.get('mode', 'business')
+            mode = fields.get('mode', 'business')
 
             # Generate Visualization Data (Fast)
             from analytics.visualization import prepare_chart_data
@@ -187,26 +348,26 @@ def dashboard():
                 'chart_data': chart_data,
                 'preview_html': df.head(10).to_html(classes='table table-striped', index=False),
                 'mode': mode,
-                'filename': filename
+                'filename': filename,
+                'ingest': ingest_stats
             }
+            _build_chart_payload(data)
             session['latest_filename'] = filename # For cache recovery
+            # New dataset, new conversation
+            CHAT_SESSIONS.pop(user, None)
             
             # Generate insights immediately in a background thread
             threading.Thread(target=_ensure_insights, args=(user, data)).start()
             ANALYSIS_CACHE[user] = data
 
             return redirect(url_for('dashboard')) # PRG pattern
-            
-        else:
-            flash('Please upload a valid CSV file.', 'danger')
 
     # Retrieve from cache
     data = get_cached_data()
     
     return render_template(
         'dashboard.html',
-        # Only pass what's needed for the dashboard (KPIs + Charts)
-        chart_data=data.get('chart_data'),
+        # KPIs + Charts are fetched separately from /api/charts (cacheable, gzipped)
         # Extended Context for PDF Report
         insight=data.get('insight'), 
         preview_html=data.get('preview_html'),
@@ -215,6 +376,95 @@ def dashboard():
         has_data=bool(data)
     )
 
+@app.route('/api/charts')
+def charts_api():
+    if not session.get('authenticated'):
+        return {'error': 'Unauthorized'}, 401
+
+    data = get_cached_data()
+    if not data:
+        return {'error': 'No data uploaded'}, 404
+    if not data.get('chart_payload'):
+        _build_chart_payload(data)
+    payload = data['chart_payload']
+
+    # Each encoding is a different representation, so it gets its own strong ETag
+    use_gzip = bool(request.accept_encodings['gzip'])
+    etag = payload['etag'] + '-gz' if use_gzip else payload['etag']
+
+    # Conditional GET: the browser revalidates with If-None-Match and gets a 304
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    elif use_gzip:
+        response = make_response(payload['gzip'])
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = make_response(payload['body'])
+
+    response.set_etag(etag)
+    response.headers['Content-Type'] = 'application/json'
+    response.headers['Vary'] = 'Accept-Encoding, Cookie'
+    # Per-user data behind a fixed URL: cache, but always revalidate
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@app.route('/api/timeseries')
+def timeseries_api():
+    """Serve a metric over [start, end] at the finest precomputed resolution that fits `points`."""
+    if not session.get('authenticated'):
+        return {'error': 'Unauthorized'}, 401
+
+    data = get_cached_data()
+    df = data.get('df') if data else None
+    rollups = df.attrs.get('timeseries') if df is not None else None
+    if rollups is None:
+        return {'error': 'No time-series data available'}, 404
+
+    metric = request.args.get('metric') or rollups.metrics[0]
+    points = min(max(request.args.get('points', 500, type=int), 10), 5000)
+    try:
+        result = rollups.query(
+            metric,
+            start=request.args.get('start') or None,
+            end=request.args.get('end') or None,
+            max_points=points,
+        )
+    except KeyError:
+        return {'error': f'Unknown metric: {metric}', 'metrics': rollups.metrics}, 400
+    except ValueError:
+        return {'error': 'Invalid start/end timestamp'}, 400
+
+    result['time_column'] = rollups.time_col
+    return result
+
+@app.route('/api/breakdown')
+def breakdown_api():
+    """Aggregate of a metric by one categorical dimension (optionally crossed with `by`), from the cube."""
+    if not session.get('authenticated'):
+        return {'error': 'Unauthorized'}, 401
+
+    data = get_cached_data()
+    df = data.get('df') if data else None
+    cube = df.attrs.get('cube') if df is not None else None
+    if cube is None:
+        return {'error': 'No categorical breakdowns available'}, 404
+
+    dim = request.args.get('dim') or next(iter(cube.dimensions))
+    metric = request.args.get('metric') or cube.metrics[0]
+    try:
+        return cube.breakdown(
+            dim,
+            metric,
+            stat=request.args.get('stat', 'sum'),
+            by=request.args.get('by') or None,
+            top=request.args.get('top', type=int),
+            ascending=request.args.get('order') == 'asc',
+        )
+    except KeyError as e:
+        return {'error': f'Not precomputed: {e}', **cube.describe()}, 400
+    except ValueError as e:
+        return {'error': str(e)}, 400
+
 @app.route('/insights')
 def insights():
     if not session.get('authenticated'):
@@ -255,6 +505,7 @@ def logout():
     user = session.get('username')
     if user in ANALYSIS_CACHE:
         del ANALYSIS_CACHE[user]
+    CHAT_SESSIONS.pop(user, None)
     session.clear()
     flash('Logged out successfully.', 'info')
     return redirect(url_for('home'))
@@ -274,16 +525,63 @@ def chat_api():
     cached_data = get_cached_data()
     # If no data, summary is None, which the LLM handles gracefully
     summary = cached_data.get('summary') if cached_data else None
+    # Breakdowns the question asks about, answered from the precomputed cube
+    df = cached_data.get('df') if cached_data else None
+    cube = df.attrs.get('cube') if df is not None else None
+    extra_context = cube.context_for_question(question) if cube is not None else None
         
     # Generate Answer via Streaming
     from llm.ollama import get_llama_chat_stream
+    from llm.scheduler import SCHEDULER, SchedulerBusy
     from flask import Response, stream_with_context
 
+    chat_session = get_chat_session(user)
+
+    # Wait for a model slot before streaming; reject fast when the queue is too deep
+    try:
+        ticket = SCHEDULER.acquire(user)
+    except SchedulerBusy:
+        response = make_response({'error': 'The AI is busy right now. Please try again in a moment.'}, 503)
+        response.headers['Retry-After'] = '5'
+        return response
+
     def generate():
-        for chunk in get_llama_chat_stream(question, summary):
-            yield chunk
+        try:
+            for chunk in get_llama_chat_stream(question, summary, chat_session=chat_session, extra_context=extra_context):
+                yield chunk
+        finally:
+            SCHEDULER.release(ticket)
+
+    response = Response(stream_with_context(generate()), mimetype='text/plain')
+    response.headers['X-Queue-Wait-Ms'] = str(int(ticket.wait_s * 1000))
+    return response
+
+@app.route('/chat/reset', methods=['POST'])
+def chat_reset():
+    if not session.get('authenticated'):
+        return {'error': 'Unauthorized'}, 401
+    CHAT_SESSIONS.pop(session.get('username'), None)
+    return {'status': 'ok'}
 
-    return Response(stream_with_context(generate()), mimetype='text/plain')
+@app.route('/api/chat/metrics')
+def chat_metrics():
+    """Per-turn time-to-first-token and prompt-eval stats for the current conversation."""
+    if not session.get('authenticated'):
+        return {'error': 'Unauthorized'}, 401
+    chat_session = CHAT_SESSIONS.get(session.get('username'))
+    turns = chat_session.metrics if chat_session else []
+    by_turn = {m['turn']: m for m in turns}
+    return {
+        'turns': turns,
+        'ttft_turn_1_s': by_turn.get(1, {}).get('ttft_s'),
+        'ttft_turn_10_s': by_turn.get(10, {}).get('ttft_s'),
+    }
 
 if __name__ == '__main__':
+    # With the debug reloader, only preload in the child process that serves requests
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_preload()
     app.run(debug=True, host='0.0.0.0', port=5000)
+else:
+    # Imported by a WSGI server (or a benchmark/test)
+    start_preload()
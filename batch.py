@@ -0,0 +1,231 @@
+"""Headless batch analysis over a directory (or glob) of CSV exports.
+
+Usage:
+    python batch.py exports/ --out reports/
+    python batch.py "exports/2024-*.csv" --out reports/ --workers 8 --mode exam
+
+Each dataset gets one JSON report (summary, charts, parsed insights, timings)
+in the output directory. Reports are written atomically, so an interrupted run
+can simply be started again: finished datasets are skipped and datasets whose
+analysis is done but whose LLM report is missing only redo the LLM step.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import queue
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+STATUS_ANALYZED = 'analyzed'      # Analytics done, LLM insight pending
+STATUS_COMPLETE = 'complete'      # Analytics + LLM insight done
+STATUS_FAILED = 'failed'          # Analytics failed (retried on the next run)
+
+
+def _json_default(value):
+    """Make numpy / pandas scalars in the profile summary JSON-serializable."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def _write_report(path, report):
+    """Write the report atomically so an interrupted run never leaves a partial file."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, default=_json_default, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _load_report(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def collect_inputs(patterns):
+    """Expand directories and glob patterns into a sorted, de-duplicated list of CSV paths."""
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.update(glob.glob(os.path.join(pattern, '*.csv')))
+        else:
+            paths.update(p for p in glob.glob(pattern) if os.path.isfile(p))
+    return sorted(os.path.abspath(p) for p in paths)
+
+
+def report_path_for(csv_path, out_dir):
+    """One report per input; a short path hash keeps same-named files from different folders apart."""
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    digest = hashlib.sha1(csv_path.encode('utf-8')).hexdigest()[:8]
+    return os.path.join(out_dir, f"{stem}-{digest}.json")
+
+
+def analyze_file(csv_path):
+    """Run the analytics pipeline and chart preparation for one CSV (executed in a worker process)."""
+    from analytics.pipeline import run_analytics_pipeline
+    from analytics.visualization import prepare_chart_data, encode_chart_payload
+
+    timings = {}
+    start = time.perf_counter()
+    df = run_analytics_pipeline(csv_path)
+    summary = df.attrs.get('profile_summary')
+    timings['pipeline_s'] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    charts = encode_chart_payload(prepare_chart_data(df, summary))
+    timings['charts_s'] = round(time.perf_counter() - start, 3)
+
+    # Round-trip through JSON here so the parent process only receives plain types
+    return json.loads(json.dumps({
+        'source': csv_path,
+        'summary': summary,
+        'charts': charts,
+        'timings': timings,
+    }, default=_json_default))
+
+
+def _llm_worker(jobs, mode, lock, stats):
+    """Consume analyzed reports from the bounded queue and add the parsed LLM insight."""
+    from llm.insights import generate_structured_insights
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            jobs.task_done()
+            return
+        path, report = job
+        try:
+            insight_stats = {}
+            insight = generate_structured_insights(report['summary'], mode=mode, user='batch', stats=insight_stats)
+            report['timings']['llm_s'] = insight_stats['total_s']
+            report['timings']['llm_queue_wait_s'] = insight_stats['queue_wait_s']
+            report['timings']['llm_sections'] = insight_stats['sections']
+            report['insight'] = insight or None
+            failed = [title for title, s in insight_stats['sections'].items() if 'error' in s]
+            if failed:
+                # Keep status 'analyzed' so the next run retries the LLM step
+                report['error'] = f"Insight sections failed: {', '.join(failed)}"
+            else:
+                report['status'] = STATUS_COMPLETE
+                report.pop('error', None)
+            _write_report(path, report)
+            with lock:
+                stats[report['status']] = stats.get(report['status'], 0) + 1
+            print(f"[llm] {os.path.basename(report['source'])}: {report['status']} "
+                  f"({report['timings'].get('llm_s', 0):.1f}s)")
+        except Exception as e:
+            print(f"[llm] Error generating insights for {report.get('source')}: {e}")
+        finally:
+            jobs.task_done()
+
+
+def run_batch(inputs, out_dir, workers=None, llm_workers=1, queue_size=4, mode='business', use_llm=True):
+    """Analyze all inputs in a process pool and feed finished analyses to a bounded LLM queue."""
+    os.makedirs(out_dir, exist_ok=True)
+    stats = {'skipped': 0}
+    lock = threading.Lock()
+
+    jobs = queue.Queue(maxsize=queue_size)
+    threads = []
+    if use_llm:
+        for _ in range(llm_workers):
+            t = threading.Thread(target=_llm_worker, args=(jobs, mode, lock, stats), daemon=True)
+            t.start()
+            threads.append(t)
+
+    pending, resumed = [], []
+    for csv_path in inputs:
+        path = report_path_for(csv_path, out_dir)
+        existing = _load_report(path)
+        status = existing.get('status') if existing else None
+        if status == STATUS_COMPLETE or (status == STATUS_ANALYZED and not use_llm):
+            stats['skipped'] += 1
+        elif status == STATUS_ANALYZED:
+            # Resume: analytics already done, only the LLM step is missing
+            resumed.append((path, existing))
+        else:
+            pending.append((csv_path, path))
+
+    run_start = time.perf_counter()
+    # Feed resumed reports from their own thread: put() blocks while the queue
+    # is full, and that must not hold up analyzing the pending files
+    feeder = threading.Thread(target=lambda: [jobs.put(job) for job in resumed], daemon=True)
+    feeder.start()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(analyze_file, csv_path): (csv_path, path) for csv_path, path in pending}
+        for future in as_completed(futures):
+            csv_path, path = futures[future]
+            try:
+                report = future.result()
+            except Exception as e:
+                _write_report(path, {'source': csv_path, 'status': STATUS_FAILED, 'error': str(e)})
+                with lock:
+                    stats[STATUS_FAILED] = stats.get(STATUS_FAILED, 0) + 1
+                print(f"[analyze] {os.path.basename(csv_path)}: failed ({e})")
+                continue
+
+            report['mode'] = mode
+            report['insight'] = None
+            report['status'] = STATUS_ANALYZED
+            _write_report(path, report)
+            t = report['timings']
+            print(f"[analyze] {os.path.basename(csv_path)}: pipeline {t['pipeline_s']:.2f}s, "
+                  f"charts {t['charts_s']:.2f}s")
+            if use_llm:
+                jobs.put((path, report))
+            else:
+                with lock:
+                    stats[STATUS_ANALYZED] = stats.get(STATUS_ANALYZED, 0) + 1
+
+    feeder.join()
+    for _ in threads:
+        jobs.put(None)
+    for t in threads:
+        t.join()
+
+    stats['elapsed_s'] = round(time.perf_counter() - run_start, 3)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-analyze CSV exports without the web UI.")
+    parser.add_argument('inputs', nargs='+', help="CSV directories and/or glob patterns")
+    parser.add_argument('--out', default='reports', help="Output directory for JSON reports")
+    parser.add_argument('--workers', type=int, default=None, help="Analytics processes (default: CPU count)")
+    parser.add_argument('--llm-workers', type=int, default=1, help="Concurrent LLM report requests")
+    parser.add_argument('--queue-size', type=int, default=4, help="Max analyzed datasets waiting for the LLM")
+    parser.add_argument('--mode', choices=['business', 'exam'], default='business')
+    parser.add_argument('--no-llm', action='store_true', help="Skip LLM insight generation")
+    args = parser.parse_args(argv)
+
+    inputs = collect_inputs(args.inputs)
+    if not inputs:
+        print("No CSV files found.")
+        return 1
+
+    print(f"Analyzing {len(inputs)} file(s) -> {args.out}")
+    stats = run_batch(
+        inputs,
+        args.out,
+        workers=args.workers,
+        llm_workers=max(1, args.llm_workers),
+        queue_size=max(1, args.queue_size),
+        mode=args.mode,
+        use_llm=not args.no_llm,
+    )
+    print("Done:", ", ".join(f"{k}={v}" for k, v in stats.items()))
+    return 1 if stats.get(STATUS_FAILED) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
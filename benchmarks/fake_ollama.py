@@ -0,0 +1,233 @@
+"""Local stand-in for the Ollama HTTP API, for performance tests without a GPU/model.
+
+Implements /api/generate and /api/chat (streaming NDJSON and non-streaming,
+plus `format` JSON-schema output) with configurable per-token latency, model-load delay, parallelism and error
+injection.
+
+    python benchmarks/fake_ollama.py --port 11500 --token-latency 0.02 --load-delay 3
+    OLLAMA_URL=http://127.0.0.1:11500/api/generate python app.py
+
+Or in-process: `server, url = start_fake_ollama(token_latency=0.01)`.
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = ("the data shows a clear upward trend in revenue while costs remain stable "
+         "and a few outliers in the north region suggest reviewing data quality").split()
+
+
+class FakeOllamaConfig:
+    def __init__(self, token_latency=0.02, tokens=64, load_delay=0.0, keep_alive=300.0,
+                 error_rate=0.0, midstream_error_rate=0.0, parallel=1, seed=None):
+        self.token_latency = token_latency      # Seconds between streamed tokens
+        self.tokens = tokens                    # Tokens generated per request (capped by num_predict)
+        self.load_delay = load_delay            # Cold model load, paid again after keep_alive idle seconds
+        self.keep_alive = keep_alive
+        self.error_rate = error_rate            # Probability of an HTTP 500 before any output
+        self.midstream_error_rate = midstream_error_rate  # Probability of dropping the stream halfway
+        self.parallel = parallel                # Like OLLAMA_NUM_PARALLEL; extra requests queue
+        self.random = random.Random(seed)
+
+
+class _ModelState:
+    def __init__(self, config):
+        self.config = config
+        self.slots = threading.Semaphore(max(1, config.parallel))
+        self.load_lock = threading.Lock()
+        self.last_used = None
+        self.requests = 0
+
+    def ensure_loaded(self):
+        """Sleep for the load delay if the model is cold (first use or idle past keep_alive)."""
+        with self.load_lock:
+            now = time.perf_counter()
+            cold = self.last_used is None or now - self.last_used > self.config.keep_alive
+            if cold and self.config.load_delay:
+                time.sleep(self.config.load_delay)
+            self.last_used = time.perf_counter()
+            return cold
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state = None  # Set per server class in start_fake_ollama()
+
+    def log_message(self, format, *args):
+        pass  # Keep load-test output readable
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path in ('/', '/api/version'):
+            self._send_json(200, {'version': 'fake'})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path not in ('/api/generate', '/api/chat'):
+            self._send_json(404, {'error': 'not found'})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send_json(400, {'error': 'invalid JSON'})
+            return
+
+        state, config = self.state, self.state.config
+        state.requests += 1
+        if config.random.random() < config.error_rate:
+            self._send_json(500, {'error': 'injected failure'})
+            return
+
+        is_chat = self.path == '/api/chat'
+        prompt_text = (json.dumps(payload.get('messages', [])) if is_chat else payload.get('prompt', ''))
+        options = payload.get('options') or {}
+        n_tokens = min(config.tokens, options.get('num_predict') or config.tokens)
+
+        with state.slots:
+            start = time.perf_counter()
+            state.ensure_loaded()
+            load_ns = int((time.perf_counter() - start) * 1e9)
+
+            # Empty prompt = load the model only (what prewarm_model sends)
+            if not is_chat and not prompt_text:
+                n_tokens = 0
+            tokens = self._tokens(payload, n_tokens)
+
+            if payload.get('stream', True):
+                self._stream(tokens, is_chat, prompt_text, load_ns)
+            else:
+                time.sleep(config.token_latency * len(tokens))
+                body = self._final(is_chat, prompt_text, load_ns, len(tokens))
+                text = ''.join(tokens)
+                if is_chat:
+                    body['message'] = {'role': 'assistant', 'content': text}
+                else:
+                    body['response'] = text
+                self._send_json(200, body)
+
+    def _tokens(self, payload, n_tokens):
+        rnd = self.state.config.random
+        fmt = payload.get('format')
+        if fmt and n_tokens:
+            # Structured output: a JSON object matching the schema, emitted as one token per field
+            properties = fmt.get('properties', {}) if isinstance(fmt, dict) else {'response': {}}
+            per_field = max(1, n_tokens // max(1, len(properties)))
+            obj = {}
+            for name, spec in properties.items():
+                if spec.get('enum'):
+                    obj[name] = rnd.choice(spec['enum'])
+                else:
+                    obj[name] = ' '.join(rnd.choice(WORDS) for _ in range(per_field))
+            text = json.dumps(obj)
+            return [text[i:i + 16] for i in range(0, len(text), 16)]
+        return [rnd.choice(WORDS) + ' ' for _ in range(n_tokens)]
+
+    def _final(self, is_chat, prompt_text, load_ns, n_tokens):
+        body = {
+            'model': 'fake',
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'done': True,
+            'load_duration': load_ns,
+            'prompt_eval_count': len(prompt_text) // 4,
+            'prompt_eval_duration': len(prompt_text) * 10_000,
+            'eval_count': n_tokens,
+        }
+        if is_chat:
+            body['message'] = {'role': 'assistant', 'content': ''}
+        else:
+            body['response'] = ''
+        return body
+
+    def _stream(self, tokens, is_chat, prompt_text, load_ns):
+        config = self.state.config
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        fail_at = len(tokens) // 2 if config.random.random() < config.midstream_error_rate else None
+        try:
+            for i, token in enumerate(tokens):
+                if i == fail_at:
+                    self.close_connection = True
+                    return  # Abrupt end without the terminating chunk
+                time.sleep(config.token_latency)
+                chunk = {'model': 'fake', 'done': False}
+                if is_chat:
+                    chunk['message'] = {'role': 'assistant', 'content': token}
+                else:
+                    chunk['response'] = token
+                self._write_chunk(chunk)
+            self._write_chunk(self._final(is_chat, prompt_text, load_ns, len(tokens)))
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _write_chunk(self, obj):
+        data = json.dumps(obj).encode('utf-8') + b'\n'
+        self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping idle keep-alive connections is normal under load
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+def start_fake_ollama(host='127.0.0.1', port=0, **config_kwargs):
+    """Start the fake server in a daemon thread. Returns (server, generate_url)."""
+    config = FakeOllamaConfig(**config_kwargs)
+    handler = type('FakeOllamaHandler', (_Handler,), {'state': _ModelState(config)})
+    server = _Server((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/api/generate"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake Ollama server for load tests.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11500)
+    parser.add_argument('--token-latency', type=float, default=0.02)
+    parser.add_argument('--tokens', type=int, default=64)
+    parser.add_argument('--load-delay', type=float, default=0.0)
+    parser.add_argument('--keep-alive', type=float, default=300.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--midstream-error-rate', type=float, default=0.0)
+    parser.add_argument('--parallel', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server, url = start_fake_ollama(
+        args.host, args.port,
+        token_latency=args.token_latency, tokens=args.tokens, load_delay=args.load_delay,
+        keep_alive=args.keep_alive, error_rate=args.error_rate,
+        midstream_error_rate=args.midstream_error_rate, parallel=args.parallel, seed=args.seed,
+    )
+    print(f"Fake Ollama listening: OLLAMA_URL={url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""Concurrent load test for /chat and upload -> insights, against a fake (or real) Ollama.
+
+Runs the Flask app in-process with N simulated users (one thread and one
+test client each) and reports p50/p95/p99 time-to-first-token, throughput
+and error rates per flow.
+
+    python benchmarks/load_test.py --users 20 --requests 5
+    python benchmarks/load_test.py --scenario insights --users 5 --token-latency 0.05
+    python benchmarks/load_test.py --ollama-url http://localhost:11434/api/generate   # real model
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+QUESTIONS = [
+    "What is the overall trend?",
+    "Which column has the most missing values?",
+    "Are there any outliers I should worry about?",
+    "Summarize the dataset in two sentences.",
+    "What should I investigate next?",
+]
+
+
+def _synthetic_csv(rows=500, seed=0):
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=rows, freq='h').astype(str),
+        'region': rng.choice(['North', 'South', 'East', 'West'], rows),
+        'sales': rng.normal(100, 15, rows).round(2),
+        'qty': rng.integers(1, 20, rows),
+    })
+    return df.to_csv(index=False).encode('utf-8')
+
+
+def _percentiles(values):
+    import numpy as np
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None}
+    p = np.percentile(values, [50, 95, 99])
+    return {'p50': round(float(p[0]), 3), 'p95': round(float(p[1]), 3), 'p99': round(float(p[2]), 3)}
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}  # flow -> list of dicts
+
+    def add(self, flow, **sample):
+        with self.lock:
+            self.samples.setdefault(flow, []).append(sample)
+
+    def report(self, wall_s):
+        out = {}
+        for flow, samples in self.samples.items():
+            ok = [s for s in samples if s['outcome'] == 'ok']
+            n = len(samples)
+            out[flow] = {
+                'requests': n,
+                'ok': len(ok),
+                'error_rate': round(sum(s['outcome'] == 'error' for s in samples) / n, 4) if n else 0,
+                'busy_rate': round(sum(s['outcome'] == 'busy' for s in samples) / n, 4) if n else 0,
+                'throughput_rps': round(len(ok) / wall_s, 3) if wall_s else None,
+                'total_s': _percentiles([s['total_s'] for s in ok]),
+            }
+            ttfts = [s['ttft_s'] for s in ok if s.get('ttft_s') is not None]
+            if ttfts:  # Only streamed flows have a first token
+                out[flow]['ttft_s'] = _percentiles(ttfts)
+            queue_waits = [s['queue_wait_s'] for s in ok if s.get('queue_wait_s') is not None]
+            if queue_waits:
+                out[flow]['queue_wait_s'] = _percentiles(queue_waits)
+        return out
+
+
+def _login(client, username):
+    with client.session_transaction() as sess:
+        sess['authenticated'] = True
+        sess['username'] = username
+
+
+def run_chat(client, recorder, n_requests, think_time):
+    for i in range(n_requests):
+        question = QUESTIONS[i % len(QUESTIONS)]
+        start = time.perf_counter()
+        response = client.post('/chat', json={'question': question}, buffered=False)
+        if response.status_code == 503:
+            recorder.add('chat', outcome='busy', total_s=time.perf_counter() - start)
+            response.close()
+            continue
+        if response.status_code != 200:
+            recorder.add('chat', outcome='error', total_s=time.perf_counter() - start)
+            response.close()
+            continue
+
+        ttft, text = None, []
+        for chunk in response.response:
+            if chunk and ttft is None:
+                ttft = time.perf_counter() - start
+            text.append(chunk.decode('utf-8', 'replace') if isinstance(chunk, bytes) else chunk)
+        response.close()
+        total = time.perf_counter() - start
+        wait_ms = response.headers.get('X-Queue-Wait-Ms')
+        outcome = 'error' if ''.join(text).startswith(' Error:') or not text else 'ok'
+        recorder.add('chat', outcome=outcome, ttft_s=ttft, total_s=total,
+                     queue_wait_s=int(wait_ms) / 1000 if wait_ms else None)
+        if think_time:
+            time.sleep(think_time)
+
+
+def run_insights(app_module, client, username, recorder, csv_bytes, timeout):
+    start = time.perf_counter()
+    response = client.post('/dashboard', data={
+        'file': (io.BytesIO(csv_bytes), f'{username}.csv'),
+        'mode': 'business',
+    }, content_type='multipart/form-data')
+    upload_s = time.perf_counter() - start
+    if response.status_code != 302:
+        recorder.add('upload', outcome='error', total_s=upload_s)
+        return
+    recorder.add('upload', outcome='ok', total_s=upload_s)
+
+    # Insights are generated in a background thread; poll the cache for completion
+    while time.perf_counter() - start < timeout:
+        data = app_module.ANALYSIS_CACHE.get(username) or {}
+        insight = data.get('insight')
+        if insight is not None:
+            sections = (data.get('insight_stats') or {}).get('sections', {})
+            failed = not insight or any('error' in s for s in sections.values())
+            recorder.add('insights', outcome='error' if failed else 'ok',
+                         total_s=time.perf_counter() - start,
+                         queue_wait_s=data.get('insight_queue_wait_s'))
+            return
+        time.sleep(0.05)
+    recorder.add('insights', outcome='error', total_s=time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test chat and upload->insights flows.")
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=5, help="Chat requests per user")
+    parser.add_argument('--scenario', choices=['chat', 'insights', 'mixed'], default='mixed')
+    parser.add_argument('--think-time', type=float, default=0.0, help="Pause between a user's chat requests")
+    parser.add_argument('--insight-timeout', type=float, default=300.0)
+    parser.add_argument('--ollama-url', default=None, help="Use this Ollama instead of the built-in fake")
+    # Fake server knobs
+    parser.add_argument('--token-latency', type=float, default=0.01)
+    parser.add_argument('--tokens', type=int, default=48)
+    parser.add_argument('--load-delay', type=float, default=0.5)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--parallel', type=int, default=2)
+    args = parser.parse_args(argv)
+
+    if args.ollama_url:
+        ollama_url = args.ollama_url
+    else:
+        from benchmarks.fake_ollama import start_fake_ollama
+        _, ollama_url = start_fake_ollama(
+            token_latency=args.token_latency, tokens=args.tokens, load_delay=args.load_delay,
+            error_rate=args.error_rate, parallel=args.parallel, seed=0,
+        )
+    # Must be set before llm.ollama is imported
+    os.environ['OLLAMA_URL'] = ollama_url
+    os.environ.setdefault('APP_PRELOAD', '0')
+
+    import app as app_module
+    recorder = Recorder()
+    csv_bytes = _synthetic_csv()
+    barrier = threading.Barrier(args.users)
+
+    def simulated_user(i):
+        username = f'loadtest-{i}'
+        client = app_module.app.test_client()
+        _login(client, username)
+        barrier.wait()
+        if args.scenario in ('insights', 'mixed'):
+            run_insights(app_module, client, username, recorder, csv_bytes, args.insight_timeout)
+        if args.scenario in ('chat', 'mixed'):
+            run_chat(client, recorder, args.requests, args.think_time)
+
+    threads = [threading.Thread(target=simulated_user, args=(i,)) for i in range(args.users)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall_s = time.perf_counter() - start
+
+    report = {
+        'users': args.users,
+        'scenario': args.scenario,
+        'ollama_url': ollama_url,
+        'wall_s': round(wall_s, 3),
+        'flows': recorder.report(wall_s),
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
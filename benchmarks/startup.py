@@ -0,0 +1,95 @@
+"""Startup benchmark: import time, time-to-ready and first-request latency.
+
+Measures the first upload and the first /chat time-to-first-token, which pays
+the model load unless the prewarm already did. By default the model is the
+fake Ollama from benchmarks/fake_ollama.py with a simulated load delay.
+
+Run from the repository root in a fresh interpreter (each run must be cold):
+    python benchmarks/startup.py --load-delay 3
+    python benchmarks/startup.py --load-delay 3 --no-preload   # compare against lazy-only startup
+    python benchmarks/startup.py --ollama-url http://localhost:11434/api/generate   # real model
+"""
+import os
+import sys
+import time
+import json
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--no-preload', action='store_true', help="Disable the background preload thread")
+    parser.add_argument('--ready-timeout', type=float, default=60.0)
+    parser.add_argument('--ollama-url', default=None, help="Use this Ollama instead of the built-in fake")
+    parser.add_argument('--load-delay', type=float, default=3.0, help="Fake model load time in seconds")
+    args = parser.parse_args(argv)
+
+    if args.no_preload:
+        os.environ['APP_PRELOAD'] = '0'
+    if args.ollama_url:
+        os.environ['OLLAMA_URL'] = args.ollama_url
+    else:
+        from benchmarks.fake_ollama import start_fake_ollama
+        _, os.environ['OLLAMA_URL'] = start_fake_ollama(load_delay=args.load_delay, token_latency=0.01, seed=0)
+
+    results = {'preload': not args.no_preload, 'ollama_url': os.environ['OLLAMA_URL']}
+
+    process_start = start = time.perf_counter()
+    import app as app_module
+    results['import_s'] = round(time.perf_counter() - start, 3)
+
+    client = app_module.app.test_client()
+
+    start = time.perf_counter()
+    client.get('/healthz')
+    results['healthz_s'] = round(time.perf_counter() - start, 4)
+
+    if not args.no_preload:
+        start = time.perf_counter()
+        while client.get('/readyz').status_code != 200:
+            if time.perf_counter() - start > args.ready_timeout:
+                break
+            time.sleep(0.01)
+        results['time_to_ready_s'] = round(time.perf_counter() - start, 3)
+        results['readyz'] = client.get('/readyz').get_json()
+
+    # First upload after start: authenticated POST of a small CSV
+    with client.session_transaction() as sess:
+        sess['authenticated'] = True
+        sess['username'] = '__startup_bench__'
+    import io
+    start = time.perf_counter()
+    response = client.post('/dashboard', data={
+        'file': (io.BytesIO(app_module.WARMUP_CSV), 'startup_bench.csv'),
+        'mode': 'business',
+    }, content_type='multipart/form-data')
+    results['first_upload_s'] = round(time.perf_counter() - start, 3)
+    results['first_upload_status'] = response.status_code
+
+    start = time.perf_counter()
+    response = client.get('/api/charts')
+    results['first_charts_s'] = round(time.perf_counter() - start, 4)
+
+    # First chat after start: time to first token includes any model load the prewarm didn't cover
+    results['first_chat_model_state'] = client.get('/readyz').get_json()['model']
+    results['first_chat_at_s'] = round(time.perf_counter() - process_start, 3)
+    start = time.perf_counter()
+    response = client.post('/chat', json={'question': 'What is the overall trend?'}, buffered=False)
+    ttft = None
+    for chunk in response.response:
+        if chunk and ttft is None:
+            ttft = time.perf_counter() - start
+    response.close()
+    results['first_chat_status'] = response.status_code
+    results['first_chat_ttft_s'] = round(ttft, 3) if ttft is not None else None
+    results['first_chat_total_s'] = round(time.perf_counter() - start, 3)
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
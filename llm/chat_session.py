@@ -0,0 +1,97 @@
+import threading
+
+NUM_CTX = 2048
+NUM_PREDICT = 512
+CHARS_PER_TOKEN = 4         # Rough estimate; good enough for budgeting the prompt
+SUMMARY_SNIPPET_CHARS = 160
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class ChatSession:
+    """Server-side conversation state for one user.
+
+    Messages are sent to Ollama's /api/chat as an append-only list so the
+    prompt prefix stays identical between turns and the runner can reuse its
+    KV cache instead of re-evaluating the whole history. When the history
+    outgrows the context window, the oldest turns are folded into a short
+    "earlier conversation" note until the remaining turns take at most half
+    of what is left after the system prompt and a full-size note; compacting
+    down to that low-water mark in one step (rather than just enough to fit)
+    keeps the prefix stable for several turns afterwards, and the newest turn
+    is always kept when it fits.
+    """
+
+    def __init__(self, num_ctx=NUM_CTX, num_predict=NUM_PREDICT):
+        self.num_ctx = num_ctx
+        self.num_predict = num_predict
+        self.turns = []            # [{'role': 'user'|'assistant', 'content': str}]
+        self.earlier_summary = ""  # Compacted notes from dropped turns
+        self.metrics = []          # Per-turn timing, see record_turn()
+        self.lock = threading.Lock()
+
+    def build_messages(self, question: str, data_context: str) -> list:
+        """Return the /api/chat message list for the next question, compacting history if needed."""
+        system = self._system_message(data_context)
+        budget = self.num_ctx - self.num_predict
+        if self._estimate(system, question) > budget:
+            # Low-water mark for the turns alone, after reserving room for a
+            # full summary note, so recent turns are not crowded out by it
+            base = estimate_tokens(self._system_message(data_context, summary="")['content'] + question)
+            low_water = (budget - base - self._summary_cap_tokens()) // 2
+            while len(self.turns) > 2 and self._turn_tokens() > low_water:
+                self._compact()
+            # The newest pair only goes if it cannot fit at all
+            system = self._system_message(data_context)
+            while self.turns and self._estimate(system, question) > budget:
+                self._compact()
+                system = self._system_message(data_context)
+        return [system] + list(self.turns) + [{'role': 'user', 'content': question}]
+
+    def add_turn(self, question: str, answer: str):
+        self.turns.append({'role': 'user', 'content': question})
+        self.turns.append({'role': 'assistant', 'content': answer})
+
+    def record_turn(self, ttft_s, total_s, prompt_eval_count=None, prompt_eval_ms=None):
+        """Store timing for the turn just answered (ttft = time to first token)."""
+        self.metrics.append({
+            'turn': len(self.metrics) + 1,
+            'ttft_s': round(ttft_s, 3) if ttft_s is not None else None,
+            'total_s': round(total_s, 3),
+            'prompt_eval_count': prompt_eval_count,
+            'prompt_eval_ms': prompt_eval_ms,
+            'history_messages': len(self.turns),
+        })
+
+    def _system_message(self, data_context: str, summary: str = None) -> dict:
+        summary = self.earlier_summary if summary is None else summary
+        content = f"You are a concise data analyst assistant.\nContext: {data_context}"
+        if summary:
+            content += f"\nEarlier conversation (summarized):\n{summary}"
+        return {'role': 'system', 'content': content}
+
+    def _estimate(self, system: dict, question: str) -> int:
+        text = system['content'] + question + "".join(m['content'] for m in self.turns)
+        return estimate_tokens(text) + 4 * (len(self.turns) + 2)  # Per-message template overhead
+
+    def _turn_tokens(self) -> int:
+        return sum(estimate_tokens(m['content']) + 4 for m in self.turns)
+
+    def _summary_cap_tokens(self) -> int:
+        return self.num_ctx // 8
+
+    def _compact(self):
+        """Fold the oldest Q/A pair into the summary note."""
+        dropped, self.turns = self.turns[:2], self.turns[2:]
+        notes = []
+        for msg in dropped:
+            snippet = " ".join(msg['content'].split())[:SUMMARY_SNIPPET_CHARS]
+            notes.append(f"- {'Q' if msg['role'] == 'user' else 'A'}: {snippet}")
+        self.earlier_summary = "\n".join(filter(None, [self.earlier_summary] + notes))
+        # Keep the summary well below the low-water mark so it never crowds out recent turns
+        max_chars = self._summary_cap_tokens() * CHARS_PER_TOKEN
+        if len(self.earlier_summary) > max_chars:
+            trimmed = self.earlier_summary[-max_chars:]
+            self.earlier_summary = trimmed.split("\n", 1)[-1]  # Drop the cut-off first line
@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+from .ollama import OLLAMA_URL, MODEL_NAME
+from .scheduler import SCHEDULER, PRIORITY_BACKGROUND
+
+INSIGHT_CONCURRENCY = int(os.getenv('INSIGHT_CONCURRENCY', '3'))
+# Room for FULL_SCHEMA's five fields plus JSON syntax; a cut-off answer is invalid JSON
+SECTION_NUM_PREDICT = int(os.getenv('INSIGHT_NUM_PREDICT', '450'))
+PARSE_ATTEMPTS = 2  # A section whose JSON does not parse is retried once with a larger cap
+
+CONFIDENCE = {"type": "string", "enum": ["High", "Medium", "Low"]}
+FULL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "observation": {"type": "string"},
+        "root_cause": {"type": "string"},
+        "impact": {"type": "string"},
+        "recommendation": {"type": "string"},
+        "confidence": CONFIDENCE,
+    },
+    "required": ["observation", "root_cause", "impact", "recommendation", "confidence"],
+}
+SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {"observation": {"type": "string"}, "confidence": CONFIDENCE},
+    "required": ["observation", "confidence"],
+}
+
+# (title, topic instruction, schema). Titles match what insights.html keys on
+# ('executive' -> hero card, 'conclusion' -> observation-only card).
+SECTIONS = [
+    ("Executive Summary", "Give a 2-3 sentence executive summary of the dataset.", SUMMARY_SCHEMA),
+    ("Trend Analysis", "Explain the most important trends in the metrics.", FULL_SCHEMA),
+    ("Correlation Insights", "Explain the strongest relationships between variables.", FULL_SCHEMA),
+    ("Anomaly Review", "Assess the outliers and data quality issues.", FULL_SCHEMA),
+    ("Final Conclusion", "Give a brief, high-level conclusion of the whole analysis.", SUMMARY_SCHEMA),
+]
+
+ROLES = {
+    'business': "You are a Senior Data Analyst consultant. Focus on business value, risks and actionable next steps.",
+    'exam': "You are a strict Data Science Professor. Explain the 'why' and define the statistical terms you use.",
+}
+
+
+class SectionParseError(ValueError):
+    """The model's answer for a section was not valid JSON, even after a retry."""
+
+
+def _section_facts(title: str, summary: dict) -> str:
+    """Only the statistics relevant to one section, to keep each prompt short."""
+    profile = summary.get('profile', {})
+    lines = [f"Dataset: {profile.get('rows')} rows, {profile.get('columns')} columns."]
+
+    if title == "Trend Analysis":
+        ts = summary.get('timeseries')
+        if ts:
+            lines.append(f"Time axis: {ts.get('time_column')} from {ts.get('start')} to {ts.get('end')}.")
+        for col, info in list(summary.get('trends', {}).items())[:8]:
+            lines.append(f"- {col}: {info.get('description')} (R2={float(info.get('r_squared') or 0):.2f})")
+    elif title == "Correlation Insights":
+        top = sorted(summary.get('correlations', {}).items(), key=lambda kv: abs(kv[1]), reverse=True)[:6]
+        lines += [f"- {pair}: r={value:+.2f}" for pair, value in top]
+    elif title == "Anomaly Review":
+        missing = profile.get('missing_values', {})
+        lines.append(f"Missing values (sample): {sum(missing.values())} total.")
+        for col, rows in list(summary.get('anomalies', {}).items())[:8]:
+            lines.append(f"- {col}: {len(rows)} z-score outliers in sample")
+        mv = summary.get('multivariate_anomalies')
+        if mv:
+            lines.append(f"Multivariate (IsolationForest): {mv['count']} rows ({mv['pct']}%) flagged.")
+    else:
+        n_trends = sum(1 for t in summary.get('trends', {}).values() if 'no significant' not in t.get('description', ''))
+        n_corr = sum(1 for v in summary.get('correlations', {}).values() if abs(v) >= 0.5)
+        lines.append(f"{n_trends} metrics with a trend, {n_corr} strong correlations (|r|>=0.5).")
+        mv = summary.get('multivariate_anomalies')
+        if mv:
+            lines.append(f"{mv['pct']}% of rows flagged as anomalous.")
+    return "\n".join(lines)
+
+
+def _section_prompt(title: str, instruction: str, summary: dict, mode: str) -> str:
+    return f"""{ROLES.get(mode, ROLES['business'])}
+
+DATA:
+{_section_facts(title, summary)}
+
+TASK: {instruction}
+Answer in JSON. Keep every field to at most 2 short sentences (about 30 words)."""
+
+
+def _request_section(title, instruction, schema, summary, mode, user):
+    payload = {
+        "model": MODEL_NAME,
+        "prompt": _section_prompt(title, instruction, summary, mode),
+        "stream": False,
+        "format": schema,
+        "keep_alive": "30m",
+        "options": {
+            "temperature": 0.3 if mode == 'business' else 0.5,
+            "num_predict": SECTION_NUM_PREDICT,
+            "num_ctx": 2048,
+        },
+    }
+    with SCHEDULER.slot(user, PRIORITY_BACKGROUND, reject_when_busy=False) as ticket:
+        wait_s = ticket.wait_s
+        start = time.perf_counter()
+        for attempt in range(1, PARSE_ATTEMPTS + 1):
+            response = requests.post(OLLAMA_URL, json=payload, timeout=300)
+            response.raise_for_status()
+            try:
+                fields = json.loads(response.json().get('response', ''))
+                break
+            except ValueError as e:
+                # Usually the answer hit num_predict mid-object
+                if attempt == PARSE_ATTEMPTS:
+                    raise SectionParseError(f"invalid JSON after {attempt} attempts: {e}") from e
+                payload['options']['num_predict'] = int(SECTION_NUM_PREDICT * 1.5)
+        llm_s = time.perf_counter() - start
+
+    observation = str(fields.get('observation', '')).strip()
+    section = {
+        "content": observation,
+        "observation": observation,
+        "root_cause": str(fields.get('root_cause', '')).strip(),
+        "impact": str(fields.get('impact', '')).strip(),
+        "recommendation": str(fields.get('recommendation', '')).strip(),
+        "confidence": fields.get('confidence') if fields.get('confidence') in CONFIDENCE['enum'] else "Medium",
+        "evidence": None,
+    }
+    return section, {'queue_wait_s': round(wait_s, 3), 'llm_s': round(llm_s, 3), 'attempts': attempt}
+
+
+def generate_structured_insights(profile_summary: dict, mode: str = 'business', user: str = 'background',
+                                 max_workers: int = INSIGHT_CONCURRENCY, stats: dict = None) -> dict:
+    """Generate the insight report as independent per-section JSON requests, run concurrently.
+
+    Returns {title: {content, observation, root_cause, impact, recommendation,
+    confidence, evidence}} in section order, as insights.html expects. Failed
+    sections are left out. If `stats` is given, it is filled with per-section
+    queue wait and model time.
+    """
+    start = time.perf_counter()
+    # More threads than the scheduler grants background slots would only park tickets in its queue
+    workers = max(1, min(max_workers, SCHEDULER.max_background))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            (title, pool.submit(_request_section, title, instruction, schema, profile_summary, mode, user))
+            for title, instruction, schema in SECTIONS
+        ]
+
+    insights, section_stats = {}, {}
+    for title, future in futures:
+        try:
+            insights[title], section_stats[title] = future.result()
+        except Exception as e:
+            print(f"Insight section '{title}' failed: {e}")
+            section_stats[title] = {'error': str(e), 'parse_error': isinstance(e, SectionParseError)}
+
+    if stats is not None:
+        waits = [s['queue_wait_s'] for s in section_stats.values() if 'queue_wait_s' in s]
+        stats['sections'] = section_stats
+        stats['queue_wait_s'] = max(waits) if waits else None
+        stats['total_s'] = round(time.perf_counter() - start, 3)
+    return insights
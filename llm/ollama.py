@@ -1,8 +1,10 @@
 import requests
 import json
 import os
+import time
 
 OLLAMA_URL = os.getenv('OLLAMA_URL', 'http://localhost:11434/api/generate')
+OLLAMA_CHAT_URL = os.getenv('OLLAMA_CHAT_URL', OLLAMA_URL.rsplit('/api/', 1)[0] + '/api/chat')
 MODEL_NAME = os.getenv('OLLAMA_MODEL', 'llama3.2:1b')
 
 def _extract_data_context(profile_summary: dict, lean: bool = False) -> str:
@@ -16,123 +18,27 @@ def _extract_data_context(profile_summary: dict, lean: bool = False) -> str:
     data_context = f"Data: {profile.get('rows')} rows, {profile.get('columns')} cols.\n"
     return data_context
 
-def _format_prompt(profile_summary: dict, mode: str) -> str:
-    """Create a structured prompt for LLaMA based on profiling data and selected mode."""
-    data_context = _extract_data_context(profile_summary)
-
-    # Mode-Specific Instructions
-    # Mode-Specific Instructions
-    if mode == 'exam':
-        role = "You are a strict Data Science Professor evaluating a student's dataset."
-        goal = "Explain the 'Why' and 'How' behind the metrics. Define statistical terms used (e.g., Standard Deviation, Correlation). Provide a deep, educational analysis."
-        structure = """
-MUST use this structure:
-## 1. Executive Summary
-(Brief overview)
-
-## 2. Statistical Deep Dive
-(Explain the metrics calculated. Why are they important? Define terms.)
-
-## 3. Explanations & Reasoning
-(Why did trends/anomalies happen? Hypothesize based on data.)
-
-## 4. Exam-Style Questions & Recommendations
-(What should the student investigate next? Ask a Viva question.)
-"""
-    else: # business (default)
-        role = "You are a Senior Data Analyst consultant for a Fortune 500 company."
-        goal = "Provide a comprehensive report including an Executive Summary followed by multiple analytical sections. Focus on business value, risks, and actionable next steps."
-    structure = """
-MUST use this structure for every section. Each insight MUST have these specific headings.
-DO NOT put everything into one paragraph. Use these exact labels.
-
-## [Insight Title]
-Observation: [Strictly describe the DATA FACT or trend found.]
-Root Cause (Why): [The technical, logical, or process reason WHY this exists.]
-Business Impact: [The financial or operational consequence.]
-Recommendation: [Specific actionable step to take.]
-Confidence: [High/Medium/Low]
-
-EXAMPLE:
-## Revenue Performance
-Observation: Sales increased by 15% in Q3.
-Root Cause (Why): Strong demand for the new product line.
-Business Impact: Higher quarterly profits.
-Recommendation: Scale up production for Q4.
-Confidence: High
-"""
-    prompt = f"""{role}
-{goal}
-
-DATA CONTEXT:
-{data_context}
-
-INSTRUCTIONS:
-Analyze the data above and provide a detailed report.
-1. Start with an ## Executive Summary (approx 2-3 sentences).
-2. Then provide at least 3 detailed insight sections using the structure below:
-{structure}
-3. End with a ## Final Conclusion section. 
-   For this section ONLY, use the following structure:
-   ## Final Conclusion
-   Observation: [Provide a brief, high-level summary of the entire analysis.]
-   Confidence: [High/Medium/Low]
-   (DO NOT add Root Cause, Impact, or Recommendation to the Conclusion.)
-"""
-    return prompt
-
-def get_llama_explanation(profile_summary: dict, mode: str = 'business') -> str:
-    """Send the formatted prompt to the local LLaMA model via Ollama."""
-    prompt = _format_prompt(profile_summary, mode)
+def prewarm_model(timeout: int = 300) -> bool:
+    """Load the model into memory before the first user request.
+    An empty prompt makes Ollama load the model without generating anything."""
     payload = {
         "model": MODEL_NAME,
-        "prompt": prompt,
+        "prompt": "",
         "stream": False,
-        "temperature": 0.3 if mode == 'business' else 0.5, # Lower temp for business consistency
+        "keep_alive": "30m"
     }
     try:
-        response = requests.post(OLLAMA_URL, json=payload, timeout=300)
+        response = requests.post(OLLAMA_URL, json=payload, timeout=timeout)
         response.raise_for_status()
-        data = response.json()
-        return data.get('response', '').strip()
+        return True
     except Exception as e:
-        return f"Error communicating with Ollama: {e}"
-def get_llama_chat_response(question: str, profile_summary: dict = None) -> str:
-    """Ask LLaMA a question about the specific dataset context."""
-    q_lower = question.lower().strip()
-    if q_lower in {'hi', 'hello', 'hey', 'hi!', 'hello!', 'hey!'}:
-        return "Hello! How can I help with your data today?"
+        print(f"Model prewarm failed: {e}")
+        return False
 
-    if profile_summary:
-        data_section = "Context: " + _extract_data_context(profile_summary, lean=True)
-    else:
-        data_section = "Context: No data."
-
-    chat_prompt = f"""{data_section}\nQ: {question}\nA (Concise):"""
-
-    payload = {
-        "model": MODEL_NAME,
-        "prompt": chat_prompt,
-        "stream": False,
-        "temperature": 0.1,
-        "options": {
-            "num_predict": 512,
-            "num_ctx": 2048,
-            "num_thread": 4,
-            "keep_alive": "30m"
-        } 
-    }
-    
-    try:
-        response = requests.post(OLLAMA_URL, json=payload, timeout=120) 
-        response.raise_for_status()
-        data = response.json()
-        return data.get('response', '').strip()
-    except Exception as e:
-        return f"Error (Timeout - Model Loading): {str(e)}"
-
-def get_llama_chat_stream(question: str, profile_summary: dict = None):
-    """Yields LLaMA's response chunks instantly for greetings or via API for data."""
+def get_llama_chat_stream(question: str, profile_summary: dict = None, chat_session=None, extra_context: str = None):
+    """Yields LLaMA's response chunks instantly for greetings or via API for data.
+    With a ChatSession, the conversation history is sent to /api/chat (multi-turn).
+    `extra_context` carries question-specific facts (e.g. precomputed breakdowns)."""
     q_lower = question.lower().strip()
     greetings = {'hi', 'hello', 'hey', 'hi!', 'hello!', 'hey!'}
     
@@ -140,10 +46,16 @@ def get_llama_chat_stream(question: str, profile_summary: dict = None):
         yield "Hello! How can I help with your data today?"
         return
 
+    if chat_session is not None:
+        yield from _stream_session_chat(question, profile_summary, chat_session, extra_context)
+        return
+
     if profile_summary:
         data_section = "Context: " + _extract_data_context(profile_summary, lean=True)
     else:
         data_section = "Context: No data."
+    if extra_context:
+        data_section += "\n" + extra_context
 
     chat_prompt = f"""{data_section}
 Q: {question}
@@ -175,3 +87,60 @@ A (Concise):"""
                     break
     except Exception as e:
         yield f" Error: {str(e)}"
+
+def _stream_session_chat(question: str, profile_summary: dict, chat_session, extra_context: str = None):
+    """Multi-turn chat via /api/chat. The history is an append-only message list,
+    so Ollama can reuse the cached prompt prefix instead of re-evaluating it."""
+    data_context = _extract_data_context(profile_summary, lean=True) if profile_summary else "No data."
+    # Question-specific facts go into the user turn, not the system prompt,
+    # so the cached prefix stays unchanged
+    if extra_context:
+        question = f"{extra_context}\n\n{question}"
+
+    with chat_session.lock:
+        messages = chat_session.build_messages(question, data_context)
+        payload = {
+            "model": MODEL_NAME,
+            "messages": messages,
+            "stream": True,
+            "keep_alive": "30m",
+            "options": {
+                "temperature": 0.1,
+                "num_predict": chat_session.num_predict,
+                "num_ctx": chat_session.num_ctx,
+                "num_thread": 4
+            }
+        }
+
+        answer = []
+        final = {}
+        start = time.perf_counter()
+        ttft = None
+        try:
+            response = requests.post(OLLAMA_CHAT_URL, json=payload, stream=True, timeout=120)
+            response.raise_for_status()
+
+            for line in response.iter_lines():
+                if line:
+                    chunk = json.loads(line)
+                    content = chunk.get('message', {}).get('content')
+                    if content:
+                        if ttft is None:
+                            ttft = time.perf_counter() - start
+                        answer.append(content)
+                        yield content
+                    if chunk.get('done'):
+                        final = chunk
+                        break
+        except Exception as e:
+            yield f" Error: {str(e)}"
+            return
+
+        chat_session.add_turn(question, "".join(answer))
+        eval_ns = final.get('prompt_eval_duration')
+        chat_session.record_turn(
+            ttft,
+            time.perf_counter() - start,
+            prompt_eval_count=final.get('prompt_eval_count'),
+            prompt_eval_ms=round(eval_ns / 1e6, 1) if eval_ns else None,
+        )
@@ -0,0 +1,157 @@
+import os
+import time
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+PRIORITY_INTERACTIVE = 0  # Chat: a user is waiting on the response
+PRIORITY_BACKGROUND = 1   # Insight reports, batch jobs
+
+# Matches Ollama's default OLLAMA_NUM_PARALLEL (4): one slot for chat, three for reports
+MAX_CONCURRENT = int(os.getenv('LLM_MAX_CONCURRENT', '4'))
+MAX_QUEUE_DEPTH = int(os.getenv('LLM_MAX_QUEUE', '8'))
+
+
+class SchedulerBusy(Exception):
+    """Raised when the wait queue is too deep to accept another request."""
+
+
+class Ticket:
+    """One model request: tracks who asked, at which priority and how long it queued."""
+
+    def __init__(self, user, priority):
+        self.user = user
+        self.priority = priority
+        self.enqueued_at = time.perf_counter()
+        self.started_at = None
+        self.granted = False
+
+    @property
+    def wait_s(self) -> float:
+        """Seconds spent in the queue (so far, if not yet granted)."""
+        end = self.started_at if self.started_at is not None else time.perf_counter()
+        return end - self.enqueued_at
+
+
+class LLMScheduler:
+    """Admission control for the local model.
+
+    - at most `max_concurrent` requests run at once
+    - interactive requests are always dispatched before background ones, and
+      background work may only occupy `max_background` slots so a long report
+      never blocks chat entirely
+    - within a priority, users are served round-robin so one user's burst
+      cannot starve everyone else
+    - when `max_queue_depth` requests that would be served first are
+      already waiting, new requests are rejected immediately with
+      SchedulerBusy; queued background work never counts against chat
+    """
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT, max_queue_depth=MAX_QUEUE_DEPTH, max_background=None):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue_depth = max_queue_depth
+        if max_background is None:
+            max_background = max(1, self.max_concurrent - 1)
+        self.max_background = min(max_background, self.max_concurrent)
+
+        self._cond = threading.Condition()
+        # priority -> OrderedDict(user -> deque[Ticket]); dict order is the round-robin order
+        self._waiting = {PRIORITY_INTERACTIVE: OrderedDict(), PRIORITY_BACKGROUND: OrderedDict()}
+        self._queued = {PRIORITY_INTERACTIVE: 0, PRIORITY_BACKGROUND: 0}
+        self._active = {PRIORITY_INTERACTIVE: 0, PRIORITY_BACKGROUND: 0}
+
+    def acquire(self, user, priority=PRIORITY_INTERACTIVE, timeout=None, reject_when_busy=True) -> Ticket:
+        """Block until a model slot is granted and return its Ticket.
+
+        Raises SchedulerBusy if the queue is full (and `reject_when_busy`) or
+        if `timeout` seconds pass without a slot.
+        """
+        ticket = Ticket(user, priority)
+        with self._cond:
+            # Only waiters that would be dispatched before this request count
+            ahead = sum(n for p, n in self._queued.items() if p <= priority)
+            if reject_when_busy and ahead >= self.max_queue_depth:
+                raise SchedulerBusy(f"{ahead} requests already waiting")
+            self._waiting[priority].setdefault(user, deque()).append(ticket)
+            self._queued[priority] += 1
+            self._dispatch()
+
+            deadline = None if timeout is None else time.perf_counter() + timeout
+            while not ticket.granted:
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    self._remove(ticket)
+                    raise SchedulerBusy(f"no model slot within {timeout}s")
+                self._cond.wait(remaining)
+        return ticket
+
+    def release(self, ticket: Ticket):
+        """Return the slot held by `ticket` and wake the next waiter."""
+        with self._cond:
+            if not ticket.granted:
+                return
+            ticket.granted = False
+            self._active[ticket.priority] -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, user, priority=PRIORITY_INTERACTIVE, timeout=None, reject_when_busy=True):
+        ticket = self.acquire(user, priority, timeout=timeout, reject_when_busy=reject_when_busy)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'active_interactive': self._active[PRIORITY_INTERACTIVE],
+                'active_background': self._active[PRIORITY_BACKGROUND],
+                'queued_interactive': self._queued[PRIORITY_INTERACTIVE],
+                'queued_background': self._queued[PRIORITY_BACKGROUND],
+                'max_concurrent': self.max_concurrent,
+                'max_queue_depth': self.max_queue_depth,
+            }
+
+    # -- internals (caller holds self._cond) ---------------------------------
+
+    def _dispatch(self):
+        granted_any = False
+        while sum(self._active.values()) < self.max_concurrent:
+            ticket = self._next_ticket(PRIORITY_INTERACTIVE)
+            if ticket is None and self._active[PRIORITY_BACKGROUND] < self.max_background:
+                ticket = self._next_ticket(PRIORITY_BACKGROUND)
+            if ticket is None:
+                break
+            ticket.granted = True
+            ticket.started_at = time.perf_counter()
+            self._active[ticket.priority] += 1
+            self._queued[ticket.priority] -= 1
+            granted_any = True
+        if granted_any:
+            self._cond.notify_all()
+
+    def _next_ticket(self, priority):
+        users = self._waiting[priority]
+        if not users:
+            return None
+        user, tickets = next(iter(users.items()))
+        ticket = tickets.popleft()
+        # Rotate: this user goes to the back of the line (or leaves it if done)
+        del users[user]
+        if tickets:
+            users[user] = tickets
+        return ticket
+
+    def _remove(self, ticket):
+        users = self._waiting[ticket.priority]
+        tickets = users.get(ticket.user)
+        if tickets and ticket in tickets:
+            tickets.remove(ticket)
+            self._queued[ticket.priority] -= 1
+            if not tickets:
+                del users[ticket.user]
+
+
+# Shared by the Flask app (chat + background insights) and the batch CLI
+SCHEDULER = LLMScheduler()
@@ -33,14 +33,32 @@ document.addEventListener('DOMContentLoaded', () => {
 
         // Show loading state
         const loadingId = appendMessage("Thinking...", 'bot', true);
+        askQuestion(text, loadingId, true);
+    }
 
-        // API Call with Streaming
+    // API Call with Streaming. When the server is busy (503) it is retried
+    // once after the Retry-After delay.
+    function askQuestion(text, loadingId, retryWhenBusy) {
         fetch('/chat', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ question: text })
         })
             .then(async res => {
+                if (res.status === 503) {
+                    const body = await res.json().catch(() => ({}));
+                    const busyText = body.error || "The AI is busy right now. Please try again in a moment.";
+                    if (!retryWhenBusy) {
+                        removeMessage(loadingId);
+                        appendMessage(busyText, 'bot');
+                        return;
+                    }
+                    const retryAfter = parseInt(res.headers.get('Retry-After'), 10) || 5;
+                    const loadingDiv = document.getElementById(loadingId);
+                    if (loadingDiv) loadingDiv.textContent = `${busyText} Retrying in ${retryAfter}s...`;
+                    setTimeout(() => askQuestion(text, loadingId, false), retryAfter * 1000);
+                    return;
+                }
                 if (!res.ok) {
                     if (res.status === 401) throw new Error("Your session has expired. Please log in again.");
                     throw new Error("Server error occurred.");
@@ -0,0 +1,157 @@
+document.addEventListener('DOMContentLoaded', () => {
+    const kpiContainer = document.getElementById('kpi-section');
+    if (!kpiContainer) return; // Not on a page with charts
+
+    // Chart data is served separately so the browser can cache it (ETag + gzip)
+    fetch('/api/charts', { credentials: 'same-origin' })
+        .then(res => {
+            if (!res.ok) throw new Error('Failed to load chart data');
+            return res.json();
+        })
+        .then(renderDashboard)
+        .catch(err => console.error(err));
+
+    // Columnar {x: [...], y: [...]} -> Chart.js point objects
+    function toPoints(series) {
+        return series.x.map((x, i) => ({ x: x, y: series.y[i] }));
+    }
+
+    function renderDashboard(chartData) {
+        // 1. Render KPIs
+        if (chartData && chartData.kpi) {
+            const kpis = [
+                { label: 'Total Rows', value: chartData.kpi.rows, sub: 'Dataset Size' },
+                { label: 'Total Columns', value: chartData.kpi.columns, sub: 'Attributes' },
+                { label: 'Missing Values', value: chartData.kpi.missing_count, sub: `${chartData.kpi.missing_pct}% Detected` },
+                { label: 'Anomalies', value: chartData.kpi.anomaly_count, sub: `${chartData.kpi.anomaly_pct}% Outliers` }
+            ];
+
+            kpis.forEach(kpi => {
+                const card = document.createElement('div');
+                card.className = 'kpi-card';
+                card.innerHTML = `
+                    <div class="kpi-value">${kpi.value.toLocaleString()}</div>
+                    <div class="kpi-label">${kpi.label}</div>
+                    <div class="kpi-subtext">${kpi.sub}</div>
+                `;
+                kpiContainer.appendChild(card);
+            });
+        }
+
+        // Chart Configuration using Chart.js
+        if (!window.Chart) return;
+
+        const style = getComputedStyle(document.documentElement);
+        const chartTextColor = style.getPropertyValue('--chart-text').trim() || '#94a3b8';
+        const chartGridColor = style.getPropertyValue('--chart-grid').trim() || '#334155';
+        const textPrimary = style.getPropertyValue('--text-primary').trim() || '#ffffff';
+
+        Chart.defaults.color = chartTextColor;
+        Chart.defaults.borderColor = chartGridColor;
+        const commonOptions = {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    labels: { color: textPrimary, font: { family: 'Inter' } }
+                }
+            },
+            scales: {
+                x: { grid: { color: chartGridColor }, ticks: { color: chartTextColor } },
+                y: { grid: { color: chartGridColor }, ticks: { color: chartTextColor } }
+            }
+        };
+
+        // Trend Chart
+        if (chartData.trend) {
+            new Chart(document.getElementById('trendChart').getContext('2d'), {
+                type: 'line',
+                data: {
+                    labels: chartData.trend.labels,
+                    datasets: [{
+                        label: chartData.trend.label,
+                        data: chartData.trend.data,
+                        borderColor: '#2563eb',
+                        backgroundColor: 'rgba(37, 99, 235, 0.1)',
+                        fill: true,
+                        tension: 0.4
+                    }]
+                },
+                options: commonOptions
+            });
+        }
+        // Bar Chart
+        if (chartData.bar) {
+            new Chart(document.getElementById('barChart').getContext('2d'), {
+                type: 'bar',
+                data: {
+                    labels: chartData.bar.labels,
+                    datasets: [{
+                        label: chartData.bar.label,
+                        data: chartData.bar.data,
+                        backgroundColor: ['#3b82f6', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#ec4899', '#6366f1', '#14b8a6'],
+                        borderRadius: 4
+                    }]
+                },
+                options: commonOptions
+            });
+        }
+        // Scatter Chart
+        if (chartData.scatter) {
+            new Chart(document.getElementById('scatterChart').getContext('2d'), {
+                type: 'scatter',
+                data: {
+                    datasets: [
+                        { label: 'Normal', data: toPoints(chartData.scatter.normal), backgroundColor: '#3b82f6', pointRadius: 2 },
+                        { label: 'Anomaly', data: toPoints(chartData.scatter.anomalies), backgroundColor: '#ef4444', pointRadius: 5 }
+                    ]
+                },
+                options: {
+                    ...commonOptions,
+                    scales: {
+                        x: {
+                            title: { display: true, text: chartData.scatter.x_label, color: chartTextColor },
+                            grid: { color: chartGridColor },
+                            ticks: { color: chartTextColor }
+                        },
+                        y: {
+                            title: { display: true, text: chartData.scatter.y_label, color: chartTextColor },
+                            grid: { color: chartGridColor },
+                            ticks: { color: chartTextColor }
+                        }
+                    }
+                }
+            });
+        }
+        // Heatmap (Bubble)
+        if (chartData.heatmap) {
+            const labels = chartData.heatmap.labels;
+            const bubbles = [];
+            chartData.heatmap.matrix.forEach((row, xIdx) => {
+                row.forEach((val, yIdx) => {
+                    bubbles.push({ x: xIdx, y: yIdx, r: 8, v: val === null ? 0 : val });
+                });
+            });
+            new Chart(document.getElementById('heatmapChart').getContext('2d'), {
+                type: 'bubble',
+                data: {
+                    datasets: [{
+                        label: 'Correlation',
+                        data: bubbles,
+                        backgroundColor: context => {
+                            const v = context.raw ? context.raw.v : 0;
+                            return v > 0 ? `rgba(37, 99, 235, ${Math.abs(v)})` : `rgba(239, 68, 68, ${Math.abs(v)})`;
+                        }
+                    }]
+                },
+                options: {
+                    ...commonOptions,
+                    scales: {
+                        x: { ticks: { callback: v => labels[v], stepSize: 1 }, min: -0.5, max: labels.length - 0.5 },
+                        y: { ticks: { callback: v => labels[v], stepSize: 1 }, min: -0.5, max: labels.length - 0.5 }
+                    }
+                }
+            });
+        }
+    }
+});
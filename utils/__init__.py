@@ -1,2 +1 @@
 from .formatting import format_number, format_percentage
-from .insight_parser import parse_insight_markdown
\ No newline at end of file